@@ -1,90 +1,320 @@
 import json
+import logging
 import re
+import time
 
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from google.genai import types
 
+from .surface_diff import FULL_SURFACE_STATE_KEY, SURFACES_STATE_KEY, SurfaceDiff
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+A2UI_KEYS = ("beginRendering", "surfaceUpdate", "dataModelUpdate", "deleteSurface")
+MAX_OPEN_STREAMS = 1024
+# Set to true (e.g. through the run request's stateDelta) by clients that
+# accept several A2UI messages in one part.
+BATCH_STATE_KEY = "temp:a2ui_batch"
+
+_SPECIAL_CHARS = re.compile(r'[{}\[\]"\\]')
+_BRACKETS = re.compile(r"[{\[]")
+# What follows a bracket that opens A2UI JSON: a key, or an array of objects.
+_NEXT_CHAR = re.compile(r"\s*(\S)")
+_TRAILING_FENCE = re.compile(r"```(?:json)?\s*$")
+# The start of a fence that may be cut off by the end of a chunk.
+_PARTIAL_FENCE = re.compile(r"(?:```(?:j|js|jso|json)?|``?)\s*$")
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+# The A2A data part envelope around each message, pre-encoded so a message is
+# serialized once and copied once into the blob.
+_DATAPART_PREFIX = (
+    b"<a2a_datapart_json>"
+    + _dumps({"kind": "data", "metadata": {"mimeType": "application/json+a2ui"}})[:-1]
+    + b',"data":'
+)
+_DATAPART_SUFFIX = b"}</a2a_datapart_json>"
+
 
 def _wrap_a2ui_part(a2ui_message: dict) -> types.Part:
     """Wrap a single A2UI message for rendering in adk web."""
-    datapart_json = json.dumps(
-        {
-            "kind": "data",
-            "metadata": {"mimeType": "application/json+a2ui"},
-            "data": a2ui_message,
-        }
-    )
-    blob_data = (
-        b"<a2a_datapart_json>" + datapart_json.encode("utf-8") + b"</a2a_datapart_json>"
-    )
     return types.Part(
         inline_data=types.Blob(
-            data=blob_data,
+            data=b"".join((_DATAPART_PREFIX, _dumps(a2ui_message), _DATAPART_SUFFIX)),
             mime_type="text/plain",
         )
     )
 
 
-def a2ui_callback(
-    callback_context: CallbackContext,
-    llm_response: LlmResponse,
-) -> LlmResponse | None:
-    """Convert A2UI JSON in text output to rendered components."""
-    if not llm_response.content or not llm_response.content.parts:
-        return None
-    for part in llm_response.content.parts:
-        if not part.text:
-            continue
-        text = part.text.strip()
-        if not text:
-            continue
-        if not any(
-            k in text for k in ("beginRendering", "surfaceUpdate", "dataModelUpdate")
-        ):
-            continue
-        # Strip markdown fences
-        if text.startswith("```"):
-            text = text.split("\n", 1)[-1]
-            if text.endswith("```"):
-                text = text[:-3].strip()
-        # Find where JSON starts (skip conversational prefix)
-        json_start = None
-        for i, ch in enumerate(text):
-            if ch in ("[", "{"):
-                json_start = i
+def _wrap_a2ui_parts(
+    a2ui_messages: list[dict], batch: bool = False
+) -> list[types.Part]:
+    """Wrap A2UI messages one per part, or all in one part when `batch` is set.
+
+    A batched part's data is ``{"messages": [...]}``; only send it to clients
+    that unpack it (see BATCH_STATE_KEY).
+    """
+    if not batch:
+        return [_wrap_a2ui_part(message) for message in a2ui_messages]
+    return [_wrap_a2ui_part({"messages": a2ui_messages})]
+
+
+class A2uiStreamParser:
+    """Incremental parser for A2UI messages in model text output.
+
+    Feed it the text as it arrives. Each top-level object, or object directly
+    inside a top-level array, is decoded as soon as its closing brace arrives,
+    and returned if it is an A2UI message. Text before the JSON (prose,
+    markdown fences) is skipped; concatenated objects ``{...} {...}`` work too.
+    Each character is scanned once, however the text is chunked.
+
+    JSON starts at a ``{"`` or ``[{`` (whitespace allowed in between), so
+    brackets in prose, like "[see below]", are skipped. `json_start` is where
+    the first value that yielded A2UI messages (or the one still open) starts.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.messages: list[dict] = []
+        self.json_start: int | None = None
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._message_start = -1
+
+    @property
+    def settled(self) -> int:
+        """How much of `text` is known to be prose or JSON. The rest, such as
+        a trailing "{", waits for the next chunk."""
+        return self._pos
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Add `chunk` and return the A2UI messages it completed."""
+        self.text += chunk
+        text = self.text
+        completed = []
+        pos = self._pos
+        while pos < len(text):
+            # Outside JSON only brackets matter: quotes may be prose.
+            pattern = _SPECIAL_CHARS if self._stack else _BRACKETS
+            match = pattern.search(text, pos)
+            if match is None:
+                pos = len(text)
                 break
-        if json_start is None:
-            continue
-        json_text = text[json_start:]
-        # raw_decode parses JSON and ignores trailing text
+            char, index = match.group(), match.start()
+            pos = match.end()
+            if self._in_string:
+                if char == "\\":
+                    if pos == len(text):
+                        # Wait for the escaped character.
+                        pos = index
+                        break
+                    pos += 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if not self._stack:
+                    following = _NEXT_CHAR.match(text, pos)
+                    if following is None:
+                        # Wait for the character that tells JSON from prose.
+                        pos = index
+                        break
+                    if following.group(1) != ('"' if char == "{" else "{"):
+                        continue
+                    if self.json_start is None:
+                        self.json_start = index
+                if char == "{" and self._stack in ([], ["["]):
+                    self._message_start = index
+                self._stack.append(char)
+            elif self._stack.pop() != ("{" if char == "}" else "["):
+                # Unbalanced: drop what was open and look for the next value.
+                self._stack.clear()
+                self._message_start = -1
+            elif char == "}" and self._stack in ([], ["["]):
+                message = self._decode(text[self._message_start : pos])
+                self._message_start = -1
+                if message is not None:
+                    completed.append(message)
+            if (
+                not self._stack
+                and self.json_start is not None
+                and not (self.messages or completed)
+            ):
+                # The first value was not A2UI: it was part of the prose.
+                self.json_start = None
+        self._pos = pos
+        self.messages.extend(completed)
+        return completed
+
+    @staticmethod
+    def _decode(text: str) -> dict | None:
         try:
-            parsed, _ = json.JSONDecoder().raw_decode(json_text)
+            message = json.loads(text)
         except json.JSONDecodeError:
-            # Handle concatenated JSON objects: {"a":1} {"b":2}
-            try:
-                fixed = "[" + re.sub(r"\}\s*\{", "},{", json_text) + "]"
-                parsed, _ = json.JSONDecoder().raw_decode(fixed)
-            except json.JSONDecodeError:
-                continue
-        if not isinstance(parsed, list):
-            parsed = [parsed]
-        a2ui_keys = {
-            "beginRendering",
-            "surfaceUpdate",
-            "dataModelUpdate",
-            "deleteSurface",
+            return None
+        if isinstance(message, dict) and any(k in message for k in A2UI_KEYS):
+            return message
+        return None
+
+
+class _A2uiStream:
+    def __init__(self, started: float, surfaces: dict | None):
+        self.parser = A2uiStreamParser()
+        self.started = started
+        self.time_to_first_component: float | None = None
+        # What the client had when the model call started, and what it has
+        # after the messages emitted so far.
+        self.surfaces = surfaces
+        self.diff = SurfaceDiff(surfaces)
+        # How much of the parser's text was sent, or dropped, as prose.
+        self.prose_end = 0
+
+    def prose(self) -> str:
+        """Return the prose that can be sent since the last call.
+
+        Before any JSON, that is the text up to what the parser has settled,
+        minus a trailing fence that may open the JSON. Once the JSON starts,
+        it is the rest of the text before it, minus its fence. Text held back
+        while a value turned out not to be A2UI is sent once it is settled.
+        """
+        parser = self.parser
+        if parser.json_start is None:
+            end, fence = parser.settled, _PARTIAL_FENCE
+        else:
+            end, fence = parser.json_start, _TRAILING_FENCE
+        match = fence.search(parser.text, self.prose_end, end)
+        if match is not None:
+            end = match.start()
+        prose = parser.text[self.prose_end : end]
+        self.prose_end = max(self.prose_end, end)
+        return prose
+
+    def feed(self, chunk: str) -> list[dict]:
+        messages = self.parser.feed(chunk)
+        if messages and self.time_to_first_component is None:
+            self.time_to_first_component = time.perf_counter() - self.started
+            logger.info(
+                "A2UI time to first component: %.3fs", self.time_to_first_component
+            )
+        return messages
+
+    def diff_all(self) -> tuple[list[dict], SurfaceDiff]:
+        """Diff every parsed message against the surfaces at the start."""
+        diff = SurfaceDiff(self.surfaces)
+        messages = [m for message in self.parser.messages for m in diff.apply(message)]
+        return messages, diff
+
+    def metadata(self) -> dict:
+        return {
+            "a2a:response": "true",
+            "a2ui:time_to_first_component": self.time_to_first_component,
         }
-        a2ui_messages = [
-            msg
-            for msg in parsed
-            if isinstance(msg, dict) and any(k in msg for k in a2ui_keys)
+
+
+# Model calls in progress, by (invocation ID, agent name).
+_streams: dict[tuple[str, str], _A2uiStream] = {}
+
+
+def _sent_surfaces(callback_context: CallbackContext) -> dict | None:
+    if callback_context.state.get(FULL_SURFACE_STATE_KEY):
+        return None
+    return callback_context.state.get(SURFACES_STATE_KEY)
+
+
+def a2ui_before_model_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> LlmResponse | None:
+    """Start the time-to-first-component clock for a model call."""
+    _streams[callback_context.invocation_id, callback_context.agent_name] = _A2uiStream(
+        time.perf_counter(), _sent_surfaces(callback_context)
+    )
+    # Calls that failed never reach a2ui_callback's final response.
+    while len(_streams) > MAX_OPEN_STREAMS:
+        del _streams[next(iter(_streams))]
+    return None
+
+
+def a2ui_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> LlmResponse | None:
+    """Convert A2UI JSON in text output to rendered components.
+
+    With streaming, each partial response is fed to an A2uiStreamParser and
+    every A2UI message is rendered as soon as it is complete, instead of the
+    raw JSON text. The final response carries all the messages, as it does
+    without streaming. custom_metadata["a2ui:time_to_first_component"] is the
+    time in seconds from the model request (see a2ui_before_model_callback) to
+    the first complete message.
+
+    Messages are sent as a diff against what this session's client already
+    has (see SurfaceDiff), which is kept in session state. A client that lost
+    its surfaces sets FULL_SURFACE_STATE_KEY to get full messages again.
+    """
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    batch = bool(callback_context.state.get(BATCH_STATE_KEY))
+    stream = _streams.get(key)
+    if stream is None:
+        stream = _streams[key] = _A2uiStream(
+            time.perf_counter(), _sent_surfaces(callback_context)
+        )
+    text = ""
+    if llm_response.content and llm_response.content.parts:
+        text = "".join(part.text for part in llm_response.content.parts if part.text)
+
+    if llm_response.partial:
+        messages = [
+            m for message in stream.feed(text) for m in stream.diff.apply(message)
         ]
-        if not a2ui_messages:
-            continue
-        new_parts = [_wrap_a2ui_part(msg) for msg in a2ui_messages]
+        prose = stream.prose()
+        json_started = stream.parser.json_start is not None
+        if not json_started and prose == text:
+            # No JSON yet: let conversational text stream through.
+            return None
+        parts = []
+        if prose and not (json_started and prose.isspace()):
+            parts.append(types.Part(text=prose))
+        if messages:
+            parts.extend(_wrap_a2ui_parts(messages, batch))
+        if not parts:
+            return LlmResponse(partial=True)
         return LlmResponse(
-            content=types.Content(role="model", parts=new_parts),
-            custom_metadata={"a2a:response": "true"},
+            content=types.Content(role="model", parts=parts),
+            partial=True,
+            custom_metadata=stream.metadata() if messages else None,
         )
-    return None
+
+    del _streams[key]
+    if not any(k in text for k in A2UI_KEYS):
+        return None
+    if stream.parser.text != text:
+        # Not streamed, or the final text differs from the partial chunks.
+        stream = _A2uiStream(stream.started, stream.surfaces)
+        stream.feed(text)
+    if not stream.parser.messages:
+        return None
+    messages, diff = stream.diff_all()
+    callback_context.state[SURFACES_STATE_KEY] = diff.surfaces
+    if not messages:
+        parts = [types.Part(text="The UI is already up to date.")]
+    else:
+        parts = _wrap_a2ui_parts(messages, batch)
+    return LlmResponse(
+        content=types.Content(role="model", parts=parts),
+        custom_metadata=stream.metadata(),
+    )
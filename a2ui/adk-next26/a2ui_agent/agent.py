@@ -1,19 +1,16 @@
-from a2ui.basic_catalog.provider import BasicCatalog
-from a2ui.schema.manager import A2uiSchemaManager
 from google.adk.agents import Agent
 
-from .a2ui_utils import a2ui_callback
-from .resources import get_resources
+from .a2ui_utils import a2ui_before_model_callback, a2ui_callback
+from .prompt_cache import CachedSystemPrompt
+from .resources import get_resources, summarize_resources
 
-schema_manager = A2uiSchemaManager(
+instruction = CachedSystemPrompt(
     version="0.8",
-    catalogs=[BasicCatalog.get_config("0.8")],
-)
-
-instruction = schema_manager.generate_system_prompt(
     role_description=(
         "You are a cloud infrastructure assistant. When users ask about their "
-        "cloud resources, use the get_resources tool to fetch the current state."
+        "cloud resources, use the get_resources tool to fetch the current state. "
+        "For counts and summary cards, use the summarize_resources tool instead "
+        "of fetching every resource."
     ),
     workflow_description="Analyze the user's request and return structured UI when appropriate.",
     ui_description=(
@@ -33,6 +30,7 @@ root_agent = Agent(
     name="cloud_dashboard",
     description="A cloud infrastructure assistant that renders rich A2UI interfaces.",
     instruction=instruction,
-    tools=[get_resources],
+    tools=[get_resources, summarize_resources],
+    before_model_callback=a2ui_before_model_callback,
     after_model_callback=a2ui_callback,
 )
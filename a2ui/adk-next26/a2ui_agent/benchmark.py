@@ -0,0 +1,131 @@
+"""Cost of wrapping A2UI messages into A2A data parts.
+
+Builds a dashboard like the agent's for a few hundred cloud resources: a
+surfaceUpdate with a card per resource and a dataModelUpdate holding every
+row. Compares the previous encoder (json.dumps of the whole envelope, then
+encode, then concatenate) with the current one (one serialization of the
+message, joined into the blob in one copy), using orjson when it is installed,
+one part per message or batched into one part.
+
+    uv run python -m a2ui_agent.benchmark
+"""
+
+import json
+import time
+
+from google.genai import types
+
+from . import a2ui_utils
+from .a2ui_utils import _wrap_a2ui_parts
+
+ROUNDS = 50
+
+
+def previous_wrap_a2ui_part(a2ui_message: dict) -> types.Part:
+    datapart_json = json.dumps(
+        {
+            "kind": "data",
+            "metadata": {"mimeType": "application/json+a2ui"},
+            "data": a2ui_message,
+        }
+    )
+    blob_data = (
+        b"<a2a_datapart_json>" + datapart_json.encode("utf-8") + b"</a2a_datapart_json>"
+    )
+    return types.Part(inline_data=types.Blob(data=blob_data, mime_type="text/plain"))
+
+
+def dashboard(resource_count: int) -> list[dict]:
+    resources = [
+        {
+            "name": f"service-{i}",
+            "type": "Cloud Run" if i % 3 else "Cloud SQL",
+            "region": ("us-west1", "us-east1", "europe-west4")[i % 3],
+            "status": ("healthy", "warning", "error")[i % 7 % 3],
+            "cpu": "2 vCPU",
+            "memory": "1 GiB",
+            "instances": i % 5,
+            "url": f"https://service-{i}-abc123.run.app",
+            "issue": "Storage usage at 92% — résumé" if i % 7 == 1 else None,
+        }
+        for i in range(resource_count)
+    ]
+    components = [
+        {
+            "id": "root",
+            "component": {
+                "Column": {
+                    "children": {
+                        "explicitList": [f"card-{i}" for i in range(resource_count)]
+                    }
+                }
+            },
+        }
+    ]
+    for i in range(resource_count):
+        components.append(
+            {"id": f"card-{i}", "component": {"Card": {"child": f"text-{i}"}}}
+        )
+        components.append(
+            {
+                "id": f"text-{i}",
+                "component": {
+                    "Text": {
+                        "text": {"path": f"/resources/{i}/name"},
+                        "usageHint": "h3",
+                    }
+                },
+            }
+        )
+    return [
+        {"beginRendering": {"surfaceId": "dashboard", "root": "root"}},
+        {"surfaceUpdate": {"surfaceId": "dashboard", "components": components}},
+        {
+            "dataModelUpdate": {
+                "surfaceId": "dashboard",
+                "contents": [
+                    {
+                        "key": "resources",
+                        "valueMap": [
+                            {"key": str(i), "valueString": json.dumps(resource)}
+                            for i, resource in enumerate(resources)
+                        ],
+                    }
+                ],
+            }
+        },
+    ]
+
+
+def bench(wrap, messages) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        parts = wrap(messages)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    return elapsed, sum(len(part.inline_data.data) for part in parts)
+
+
+def main() -> None:
+    orjson = a2ui_utils.orjson
+    for resource_count in (50, 500):
+        messages = dashboard(resource_count)
+        print(f"{resource_count} resources")
+        a2ui_utils.orjson = None
+        runs = [
+            ("previous", lambda m: [previous_wrap_a2ui_part(x) for x in m]),
+            ("json", _wrap_a2ui_parts),
+            ("json, batched", lambda m: _wrap_a2ui_parts(m, batch=True)),
+        ]
+        for name, wrap in runs:
+            elapsed, size = bench(wrap, messages)
+            print(f"  {name:>16}: {elapsed * 1000:7.3f} ms, {size / 1024:7.1f} KiB")
+        if orjson is not None:
+            a2ui_utils.orjson = orjson
+            for name, wrap in runs[1:]:
+                elapsed, size = bench(wrap, messages)
+                name = name.replace("json", "orjson")
+                print(f"  {name:>16}: {elapsed * 1000:7.3f} ms, {size / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
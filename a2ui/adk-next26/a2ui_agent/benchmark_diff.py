@@ -0,0 +1,118 @@
+"""Bandwidth and client work with and without surface diffs.
+
+Replays fixtures/dashboard_session.jsonl, the A2UI messages the agent returns
+over a session where the user keeps asking about their resources and a few of
+them change between turns. Each turn is sent either in full or diffed by
+SurfaceDiff, to a minimal client that keeps each surface's components and data
+model. Reports the bytes sent, the components the client has to re-render and
+the time the client spends decoding and applying the messages, and checks that
+both clients end every turn with the same surfaces.
+
+    uv run python -m a2ui_agent.benchmark_diff
+"""
+
+import json
+import time
+from pathlib import Path
+
+from .a2ui_utils import _wrap_a2ui_parts
+from .surface_diff import SurfaceDiff
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "dashboard_session.jsonl"
+ROUNDS = 20
+
+
+def _value(entry: dict):
+    if "valueMap" in entry:
+        return {item["key"]: _value(item) for item in entry["valueMap"]}
+    for key in ("valueString", "valueNumber", "valueBoolean"):
+        if key in entry:
+            return entry[key]
+    return None
+
+
+class Client:
+    """Applies A2UI messages the way a renderer keeps its surfaces."""
+
+    def __init__(self):
+        self.surfaces: dict = {}
+        self.rendered = 0
+
+    def receive(self, blobs: list[bytes]) -> None:
+        for blob in blobs:
+            start = blob.index(b'"data":') + len(b'"data":')
+            end = blob.rindex(b"}</a2a_datapart_json>")
+            self.apply(json.loads(blob[start:end]))
+
+    def apply(self, message: dict) -> None:
+        body = next(iter(message.values()))
+        surface = self.surfaces.setdefault(
+            body["surfaceId"], {"root": None, "components": {}, "data": {}}
+        )
+        if "beginRendering" in message:
+            surface["root"] = body["root"]
+        elif "surfaceUpdate" in message:
+            for component in body["components"]:
+                surface["components"][component["id"]] = component["component"]
+            self.rendered += len(body["components"])
+        elif "dataModelUpdate" in message:
+            value = _value({"valueMap": body["contents"]})
+            keys = [key for key in (body.get("path") or "/").split("/") if key]
+            if not keys:
+                surface["data"] = value
+                return
+            parent = surface["data"]
+            for key in keys[:-1]:
+                parent = parent.setdefault(key, {})
+            parent[keys[-1]] = value
+        elif "deleteSurface" in message:
+            del self.surfaces[body["surfaceId"]]
+
+
+def replay(turns: list[list[dict]], diff: bool) -> tuple[list[list[bytes]], list]:
+    surface_diff = SurfaceDiff()
+    sent, states = [], []
+    client = Client()
+    for messages in turns:
+        if diff:
+            messages = [m for message in messages for m in surface_diff.apply(message)]
+        blobs = [part.inline_data.data for part in _wrap_a2ui_parts(messages)]
+        client.receive(blobs)
+        sent.append(blobs)
+        states.append(json.loads(json.dumps(client.surfaces)))
+    return sent, states
+
+
+def client_time(sent: list[list[bytes]]) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        client = Client()
+        for blobs in sent:
+            client.receive(blobs)
+    return (time.perf_counter() - start) / ROUNDS, client.rendered
+
+
+def main() -> None:
+    with FIXTURE.open() as f:
+        turns = [json.loads(line) for line in f]
+    full, full_states = replay(turns, diff=False)
+    diffed, diff_states = replay(turns, diff=True)
+    assert full_states == diff_states, "diffed surfaces differ from full ones"
+
+    print(f"{len(turns)} turns")
+    print(f"{'turn':>6} {'full KiB':>9} {'diff KiB':>9}")
+    for turn, (full_blobs, diff_blobs) in enumerate(zip(full, diffed), 1):
+        full_size = sum(map(len, full_blobs)) / 1024
+        diff_size = sum(map(len, diff_blobs)) / 1024
+        print(f"{turn:>6} {full_size:9.1f} {diff_size:9.1f}")
+    for name, sent in (("full", full), ("diff", diffed)):
+        size = sum(len(blob) for blobs in sent for blob in blobs)
+        elapsed, rendered = client_time(sent)
+        print(
+            f"{name:>6}: {size / 1024:7.1f} KiB, {rendered:5d} components "
+            f"re-rendered, client {elapsed * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
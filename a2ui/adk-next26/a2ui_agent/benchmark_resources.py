@@ -0,0 +1,85 @@
+"""Size and latency of get_resources results for large projects.
+
+Loads a synthetic project of thousands of resources into a ResourceIndex and
+compares returning every resource, as get_resources did before, with a
+default page, a filtered page and a page of a few fields, and with
+summaries from summarize_resources, which replace fetching every resource to
+count them. The time includes serializing the result to JSON, which is what
+the model gets. Also reports how long a refresh takes.
+
+    uv run python -m a2ui_agent.benchmark_resources
+"""
+
+import json
+import time
+
+from . import resources
+from .resources import ResourceIndex, get_resources, summarize_resources
+
+ROUNDS = 200
+
+
+def synthetic_resources(count: int) -> list[dict]:
+    rows = []
+    for i in range(count):
+        status = ("healthy",) * 8 + ("warning", "error")
+        row = {
+            "name": f"service-{i:05d}",
+            "type": ("Cloud Run", "Cloud SQL", "GKE", "Cloud Storage")[i % 4],
+            "region": ("us-west1", "us-east1", "europe-west4", "asia-northeast1")[
+                i // 4 % 4
+            ],
+            "status": status[i * 7 % 10],
+            "cpu": "2 vCPU",
+            "memory": "1 GiB",
+            "instances": i % 5,
+            "url": f"https://service-{i:05d}-abc123.run.app",
+            "last_deployed": "2026-04-18T14:22:00Z",
+        }
+        if row["status"] != "healthy":
+            row["issue"] = "Storage usage at 92%"
+        rows.append(row)
+    return rows
+
+
+def bench(call) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = json.dumps(call())
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    return elapsed, len(result)
+
+
+def main() -> None:
+    for count in (1_000, 10_000):
+        rows = synthetic_resources(count)
+        index = resources.RESOURCE_INDEX = ResourceIndex(
+            lambda rows=rows: rows, ttl=3600
+        )
+        start = time.perf_counter()
+        index.refresh()
+        print(
+            f"{count} resources, refresh {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        runs = [
+            ("all (previous)", lambda rows=rows: rows),
+            ("default page", get_resources),
+            ("errors", lambda: get_resources(status=["error"])),
+            (
+                "errors in us-east1",
+                lambda: get_resources(status=["error"], region=["us-east1"]),
+            ),
+            ("name, status", lambda: get_resources(fields=["status"], limit=200)),
+            ("summary", summarize_resources),
+            (
+                "summary by type, region",
+                lambda: summarize_resources(group_by=["type", "region"]),
+            ),
+        ]
+        for name, call in runs:
+            elapsed, size = bench(call)
+            print(f"  {name:>24}: {elapsed * 1e6:8.1f} µs, {size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold-start cost of the dashboard agent's system prompt.
+
+Starts a fresh interpreter per run and measures, after google.adk is
+imported (it costs the same in every case), the time until the agent module
+is imported and its instruction is available: building the prompt eagerly as
+before, with an empty prompt cache, and with a prewarmed one. Also reports
+the whole process wall time.
+
+    uv run python -m a2ui_agent.benchmark_startup
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 10
+
+PREVIOUS = """
+from a2ui.basic_catalog.provider import BasicCatalog
+from a2ui.schema.manager import A2uiSchemaManager
+from a2ui_agent.agent import instruction
+schema_manager = A2uiSchemaManager(
+    version="0.8", catalogs=[BasicCatalog.get_config("0.8")]
+)
+schema_manager.generate_system_prompt(**instruction.prompt_kwargs)
+"""
+
+CACHED = """
+from a2ui_agent.agent import instruction
+instruction()
+"""
+
+SCRIPT = """
+import time
+import google.adk.agents
+start = time.perf_counter()
+{body}
+print(time.perf_counter() - start)
+"""
+
+
+def run(body: str, cache_dir: str) -> tuple[float, float]:
+    env = dict(os.environ, A2UI_PROMPT_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(body=body)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.split()[-1]), time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cases = []
+        for name, body in [("previous", PREVIOUS), ("cache miss", CACHED)]:
+            cases.append((name, body, lambda: tempfile.mkdtemp(dir=directory)))
+        warm_dir = tempfile.mkdtemp(dir=directory)
+        run(CACHED, warm_dir)
+        cases.append(("cache hit", CACHED, lambda: warm_dir))
+
+        print(
+            f"{'':>12} {'prompt ready ms':>16} {'process ms':>11}  (median of {RUNS})"
+        )
+        for name, body, cache_dir in cases:
+            prompt_times, process_times = zip(
+                *(run(body, cache_dir()) for _ in range(RUNS))
+            )
+            print(
+                f"{name:>12} {statistics.median(prompt_times) * 1000:>16.2f}"
+                f" {statistics.median(process_times) * 1000:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
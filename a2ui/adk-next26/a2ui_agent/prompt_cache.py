@@ -0,0 +1,129 @@
+"""On-disk cache of the generated A2UI system prompt.
+
+Usage:
+
+    uv run python -m a2ui_agent.prompt_cache prewarm
+    uv run python -m a2ui_agent.prompt_cache clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from a2ui.version import __version__ as A2UI_VERSION
+from google.adk.agents.readonly_context import ReadonlyContext
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "A2UI_PROMPT_CACHE_DIR", Path(__file__).resolve().parent / ".prompt_cache"
+    )
+)
+
+
+class CachedSystemPrompt:
+    """InstructionProvider for an A2UI system prompt, cached on disk.
+
+    The prompt is read (or generated and written) the first time the agent
+    needs it, not at import time. The cache key covers the A2UI SDK version,
+    the schema version, the catalog and every generate_system_prompt argument,
+    so changing any of them generates a new prompt. Only the basic catalog
+    bundled with the SDK is supported.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        catalog: str = "basic",
+        cache_dir: str | os.PathLike = DEFAULT_CACHE_DIR,
+        **prompt_kwargs,
+    ):
+        if catalog != "basic":
+            raise ValueError(f"Unsupported catalog {catalog!r}.")
+        self.version = version
+        self.catalog = catalog
+        self.cache_dir = Path(cache_dir)
+        self.prompt_kwargs = prompt_kwargs
+        self._prompt: str | None = None
+
+    def __call__(self, readonly_context: ReadonlyContext | None = None) -> str:
+        if self._prompt is None:
+            self._prompt = self._load()
+        return self._prompt
+
+    @property
+    def key(self) -> str:
+        description = {
+            "a2ui": A2UI_VERSION,
+            "version": self.version,
+            "catalog": self.catalog,
+            "prompt": self.prompt_kwargs,
+        }
+        return hashlib.sha256(
+            json.dumps(description, sort_keys=True).encode()
+        ).hexdigest()
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / f"{self.key}.txt"
+
+    def prewarm(self) -> bool:
+        """Generate and write the prompt unless cached; return True if written."""
+        if self.path.exists():
+            return False
+        self._prompt = self._generate()
+        self._write(self._prompt)
+        return True
+
+    def _load(self) -> str:
+        try:
+            return self.path.read_text()
+        except FileNotFoundError:
+            pass
+        prompt = self._generate()
+        try:
+            self._write(prompt)
+        except OSError:
+            # A read-only deployment still works, it just does not cache.
+            pass
+        return prompt
+
+    def _generate(self) -> str:
+        # Imported here so that a cache hit does not load the schema manager.
+        from a2ui.basic_catalog.provider import BasicCatalog
+        from a2ui.schema.manager import A2uiSchemaManager
+
+        schema_manager = A2uiSchemaManager(
+            version=self.version,
+            catalogs=[BasicCatalog.get_config(self.version)],
+        )
+        return schema_manager.generate_system_prompt(**self.prompt_kwargs)
+
+    def _write(self, prompt: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(prompt)
+        tmp_path.replace(self.path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="A2UI system prompt cache")
+    parser.add_argument("command", choices=["prewarm", "clear"])
+    args = parser.parse_args(argv)
+
+    from .agent import instruction
+
+    if args.command == "prewarm":
+        written = instruction.prewarm()
+        print(f"{'Wrote' if written else 'Already cached:'} {instruction.path}")
+    else:
+        removed = 0
+        for path in instruction.cache_dir.glob("*.txt"):
+            path.unlink()
+            removed += 1
+        print(f"Removed {removed} cached prompts from {instruction.cache_dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
+import base64
+import bisect
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
 RESOURCES = [
     {
         "name": "auth-service",
@@ -36,12 +46,313 @@ RESOURCES = [
 ]
 
 
-def get_resources() -> list[dict]:
-    """Get all cloud resources in the current project.
-    Returns a list of cloud infrastructure resources including their
-    name, type, region, status, and type-specific details.
-    Status is one of: healthy, warning, error. Resources with
-    warning or error status include an 'issue' field describing
-    the problem.
-    """
+# Fields returned when the caller does not ask for others.
+SUMMARY_FIELDS = ("name", "type", "region", "status", "issue")
+INDEXED_FIELDS = ("status", "type", "region")
+STATUSES = ("healthy", "warning", "error")
+ISSUE_EXAMPLES = 3
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_TTL = 60.0
+
+ResourceLoader = Callable[[], Iterable[dict]]
+
+
+def load_sample_resources() -> list[dict]:
     return RESOURCES
+
+
+class ResourceIndex:
+    """In-memory index of the project's resources.
+
+    Resources come from `loader`, which is called again once the index is
+    older than `ttl` seconds. If a refresh fails, the previous resources are
+    served until the next attempt. Resources are kept sorted by name with
+    an index on each of INDEXED_FIELDS, so a query does not scan every
+    resource. Names repeat across regions and types, so rows are ordered and
+    paged by (name, region, type, occurrence) instead. Pages continue after
+    the last key returned, so a cursor stays valid across refreshes.
+    """
+
+    def __init__(
+        self,
+        loader: ResourceLoader = load_sample_resources,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self._loader = loader
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._loaded_at: float | None = None
+        # Sorted resources, their keys, positions by field and value, and
+        # the rollup, replaced together so a query never mixes two refreshes.
+        self._data: tuple[list[dict], list[tuple], dict[str, dict], dict] = (
+            [],
+            [],
+            {},
+            {},
+        )
+
+    def set_loader(self, loader: ResourceLoader) -> None:
+        """Load resources from `loader` from the next query on."""
+        with self._lock:
+            self._loader = loader
+            self._loaded_at = None
+
+    def refresh(self) -> None:
+        rows = sorted(self._loader(), key=_row_key)
+        positions = {field: {} for field in INDEXED_FIELDS}
+        keys = []
+        for position, row in enumerate(rows):
+            for field, index in positions.items():
+                index.setdefault(row.get(field), []).append(position)
+            key = _row_key(row)
+            # Numbers rows that are identical in every key field.
+            occurrence = keys[-1][3] + 1 if keys and keys[-1][:3] == key else 0
+            keys.append((*key, occurrence))
+        self._data = (rows, keys, positions, _rollup(rows))
+        self._loaded_at = self._clock()
+
+    def _ensure_fresh(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and self._clock() - loaded_at < self.ttl:
+            return
+        with self._lock:
+            if self._loaded_at != loaded_at:
+                return  # Refreshed by another thread meanwhile.
+            try:
+                self.refresh()
+            except Exception:
+                if loaded_at is None:
+                    raise
+                logger.exception("Resource refresh failed; serving stale data.")
+                self._loaded_at = self._clock()
+
+    def query(
+        self,
+        filters: dict[str, list[str] | None] | None = None,
+        fields: list[str] | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple | None = None,
+    ) -> tuple[list[dict], int, tuple | None]:
+        """Return a page of matching resources, the match count and the key
+        to continue after, or None on the last page."""
+        self._ensure_fresh()
+        rows, keys, positions, _ = self._data
+        matches: list[int] | None = None
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            values = list(dict.fromkeys(values))
+            index = positions[field]
+            if len(values) == 1:
+                candidates = index.get(values[0], [])
+            else:
+                candidates = sorted(p for value in values for p in index.get(value, []))
+            if matches is None:
+                matches = candidates
+            else:
+                keep = set(candidates)
+                matches = [p for p in matches if p in keep]
+        if matches is None:
+            matches = range(len(rows))
+
+        start = 0 if after is None else bisect.bisect_right(keys, after)
+        first = bisect.bisect_left(matches, start)
+        page = matches[first : first + limit]
+        fields = ["name", *(fields or SUMMARY_FIELDS)]
+        resources = [
+            {
+                field: rows[p][field]
+                for field in dict.fromkeys(fields)
+                if field in rows[p]
+            }
+            for p in page
+        ]
+        more = first + limit < len(matches)
+        return resources, len(matches), keys[page[-1]] if more else None
+
+    def summarize(
+        self,
+        filters: dict[str, list[str] | None] | None = None,
+        group_by: list[str] | None = None,
+        top_issues: int = 5,
+    ) -> dict:
+        """Count matching resources by status and total their instances per
+        group, and return the most common issues, from the rollup."""
+        self._ensure_fresh()
+        rollup = self._data[3]
+        filters = {
+            field: set(values) for field, values in (filters or {}).items() if values
+        }
+        group_by = list(dict.fromkeys(group_by or []))
+        groups: dict[tuple, dict] = {}
+        issues: dict[str, list] = {}
+        for key, cell in rollup.items():
+            values = dict(zip(INDEXED_FIELDS, key))
+            if any(
+                values[field] not in accepted for field, accepted in filters.items()
+            ):
+                continue
+            group = groups.setdefault(
+                tuple(values[field] for field in group_by), {"instances": 0}
+            )
+            group[values["status"]] = group.get(values["status"], 0) + cell["count"]
+            group["instances"] += cell["instances"]
+            for issue, (count, examples) in cell["issues"].items():
+                merged = issues.setdefault(issue, [0, []])
+                merged[0] += count
+                merged[1] = (merged[1] + examples)[:ISSUE_EXAMPLES]
+
+        statuses = [
+            *STATUSES,
+            *sorted(
+                {s for g in groups.values() for s in g} - {*STATUSES, "instances"},
+                key=str,
+            ),
+        ]
+        columns = [*group_by, *statuses, "total", "instances"]
+        table = []
+        for key, group in sorted(
+            groups.items(), key=lambda item: tuple(map(str, item[0]))
+        ):
+            counts = [group.get(status, 0) for status in statuses]
+            table.append([*key, *counts, sum(counts), group["instances"]])
+        ranked = sorted(issues.items(), key=lambda item: (-item[1][0], item[0]))
+        return {
+            "total": sum(row[-2] for row in table),
+            "instances": sum(row[-1] for row in table),
+            "columns": columns,
+            "rows": table,
+            "top_issues": [
+                {"issue": issue, "count": count, "examples": examples}
+                for issue, (count, examples) in ranked[:top_issues]
+            ],
+        }
+
+
+def _row_key(row: dict) -> tuple[str, str, str]:
+    return (row["name"], str(row.get("region") or ""), str(row.get("type") or ""))
+
+
+def _rollup(rows: list[dict]) -> dict[tuple, dict]:
+    """Resource count, instance total and issues for each combination of
+    INDEXED_FIELDS values; every summary is a sum over these cells."""
+    rollup: dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row.get(field) for field in INDEXED_FIELDS)
+        cell = rollup.setdefault(key, {"count": 0, "instances": 0, "issues": {}})
+        cell["count"] += 1
+        instances = row.get("instances")
+        if isinstance(instances, int):
+            cell["instances"] += instances
+        if row.get("issue"):
+            count, examples = cell["issues"].get(row["issue"], (0, []))
+            if len(examples) < ISSUE_EXAMPLES:
+                examples = [*examples, row["name"]]
+            cell["issues"][row["issue"]] = (count + 1, examples)
+    return rollup
+
+
+RESOURCE_INDEX = ResourceIndex()
+
+
+def _encode_cursor(after: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": after}).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    name, region, type, occurrence = json.loads(
+        base64.urlsafe_b64decode(cursor.encode())
+    )["after"]
+    if not all(isinstance(value, str) for value in (name, region, type)):
+        raise TypeError("cursor key fields must be strings")
+    if not isinstance(occurrence, int):
+        raise TypeError("cursor occurrence must be an integer")
+    return name, region, type, occurrence
+
+
+def get_resources(
+    status: list[str] | None = None,
+    type: list[str] | None = None,
+    region: list[str] | None = None,
+    fields: list[str] | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> dict:
+    """Get cloud resources in the current project, one page at a time.
+
+    Each resource has a name, type, region and status, plus type-specific
+    details. Status is one of: healthy, warning, error. Resources with
+    warning or error status include an 'issue' field describing the problem.
+
+    Args:
+        status: Only resources with one of these statuses.
+        type: Only resources of one of these types, e.g. "Cloud Run".
+        region: Only resources in one of these regions, e.g. "us-west1".
+        fields: Fields to return besides the name. Defaults to type, region,
+            status and issue; ask for details such as "instances" or "url"
+            only when they are needed.
+        limit: Maximum number of resources to return, up to 200.
+        cursor: The next_cursor of the previous page, to get the next one.
+
+    Returns:
+        The matching resources sorted by name, the total number of matches,
+        and next_cursor if there are more.
+    """
+    try:
+        after = None if cursor is None else _decode_cursor(cursor)
+    except (ValueError, KeyError, TypeError):
+        return {"status": "error", "message": f"Invalid cursor {cursor!r}."}
+    resources, total, last = RESOURCE_INDEX.query(
+        {"status": status, "type": type, "region": region},
+        fields,
+        max(1, min(limit, MAX_PAGE_SIZE)),
+        after,
+    )
+    result = {"resources": resources, "total": total}
+    if last is not None:
+        result["next_cursor"] = _encode_cursor(last)
+    return result
+
+
+def summarize_resources(
+    group_by: list[str] | None = None,
+    status: list[str] | None = None,
+    type: list[str] | None = None,
+    region: list[str] | None = None,
+    top_issues: int = 5,
+) -> dict:
+    """Summarize cloud resources in the current project without listing them.
+
+    Use this for counts and overviews, e.g. how many resources are healthy,
+    warning or error per type or region, instead of fetching every resource
+    with get_resources.
+
+    Args:
+        group_by: Fields to group by: any of "type", "region" and "status".
+            Without it, the whole project is one group.
+        status: Only resources with one of these statuses.
+        type: Only resources of one of these types, e.g. "Cloud Run".
+        region: Only resources in one of these regions, e.g. "us-west1".
+        top_issues: Number of most common issues to return.
+
+    Returns:
+        A table with one row per group: the group's values, the number of
+        resources per status, the total and the total number of instances.
+        Also the overall totals, and the most common issues with their count
+        and a few of the affected resources.
+    """
+    unknown = [field for field in group_by or [] if field not in INDEXED_FIELDS]
+    if unknown:
+        return {
+            "status": "error",
+            "message": f"Cannot group by {unknown}.",
+            "allowed_fields": list(INDEXED_FIELDS),
+        }
+    return RESOURCE_INDEX.summarize(
+        {"status": status, "type": type, "region": region},
+        group_by,
+        max(0, top_issues),
+    )
@@ -0,0 +1,132 @@
+import copy
+import hashlib
+import json
+
+# Session state key holding what was last sent for each surface.
+SURFACES_STATE_KEY = "a2ui:surfaces"
+# Set to true (e.g. through the run request's stateDelta) by a client that lost
+# its surfaces, such as after a reconnect, to get full messages again.
+FULL_SURFACE_STATE_KEY = "temp:a2ui_full_surface"
+
+
+def _digest(value) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _child_path(path: str, key: str) -> str:
+    return f"{path.rstrip('/')}/{key}"
+
+
+class SurfaceDiff:
+    """Removes from A2UI messages what the client already has.
+
+    `surfaces` records digests of what was sent per surface: the
+    beginRendering body, each component by ID, and each data model entry by
+    path and key. It is JSON-serializable so it can live in session state.
+
+    - beginRendering is dropped if it is identical to the last one.
+    - surfaceUpdate upserts components, so unchanged components are dropped.
+    - dataModelUpdate replaces the data at its path, so it is split into
+      updates of the deepest maps that changed. A map whose scalar entries
+      changed is sent whole: keeping values that change together (like a
+      summary line) in their own valueMap keeps the updates small.
+    """
+
+    def __init__(self, surfaces: dict | None = None):
+        self.surfaces: dict = copy.deepcopy(surfaces or {})
+
+    def apply(self, message: dict) -> list[dict]:
+        """Record `message` as sent and return the messages to send for it."""
+        if "beginRendering" in message:
+            return self._begin_rendering(message)
+        if "surfaceUpdate" in message:
+            return self._surface_update(message)
+        if "dataModelUpdate" in message:
+            return self._data_model_update(message)
+        if "deleteSurface" in message:
+            self.surfaces.pop(message["deleteSurface"].get("surfaceId"), None)
+        return [message]
+
+    def _surface(self, surface_id: str) -> dict:
+        return self.surfaces.setdefault(
+            surface_id, {"begin": None, "components": {}, "data": {}}
+        )
+
+    def _begin_rendering(self, message: dict) -> list[dict]:
+        body = message["beginRendering"]
+        surface = self._surface(body.get("surfaceId"))
+        digest = _digest(body)
+        if surface["begin"] == digest:
+            return []
+        surface["begin"] = digest
+        return [message]
+
+    def _surface_update(self, message: dict) -> list[dict]:
+        body = message["surfaceUpdate"]
+        sent = self._surface(body.get("surfaceId"))["components"]
+        changed = []
+        for component in body.get("components", []):
+            digest = _digest(component)
+            if sent.get(component.get("id")) != digest:
+                sent[component.get("id")] = digest
+                changed.append(component)
+        if not changed:
+            return []
+        return [{"surfaceUpdate": {**body, "components": changed}}]
+
+    def _data_model_update(self, message: dict) -> list[dict]:
+        body = message["dataModelUpdate"]
+        surface_id = body.get("surfaceId")
+        path = body.get("path") or "/"
+        contents = body.get("contents", [])
+        data = self._surface(surface_id)["data"]
+        previous = dict(data)
+
+        # The update replaces everything at and below `path`.
+        below = _child_path(path, "")
+        for recorded in [p for p in data if p == path or p.startswith(below)]:
+            del data[recorded]
+        _record(data, path, contents)
+
+        updates = _data_updates(previous, path, contents)
+        if updates == [(path, contents)]:
+            return [message]
+        return [
+            {
+                "dataModelUpdate": {
+                    "surfaceId": surface_id,
+                    "path": update_path,
+                    "contents": update_contents,
+                }
+            }
+            for update_path, update_contents in updates
+        ]
+
+
+def _record(data: dict, path: str, contents: list[dict]) -> None:
+    data[path] = {entry.get("key"): _digest(entry) for entry in contents}
+    for entry in contents:
+        if "valueMap" in entry:
+            _record(data, _child_path(path, entry["key"]), entry["valueMap"])
+
+
+def _data_updates(
+    previous: dict, path: str, contents: list[dict]
+) -> list[tuple[str, list[dict]]]:
+    """Return the smallest (path, contents) updates that turn the data model
+    recorded in `previous` into one with `contents` at `path`."""
+    digests = previous.get(path)
+    if digests is None or digests.keys() != {entry.get("key") for entry in contents}:
+        return [(path, contents)]
+    changed = [entry for entry in contents if digests[entry["key"]] != _digest(entry)]
+    if any("valueMap" not in entry for entry in changed):
+        # A scalar entry can only be replaced with its whole map.
+        return [(path, contents)]
+    return [
+        update
+        for entry in changed
+        for update in _data_updates(
+            previous, _child_path(path, entry["key"]), entry["valueMap"]
+        )
+    ]
@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from a2ui_agent.a2ui_utils import A2uiStreamParser, a2ui_callback
+
+MESSAGES = [
+    {"beginRendering": {"surfaceId": "main", "root": "root"}},
+    {
+        "surfaceUpdate": {
+            "surfaceId": "main",
+            "components": [{"id": "root", "component": {"Text": {"text": "[ok]"}}}],
+        }
+    },
+]
+
+
+def feed_in_chunks(parser: A2uiStreamParser, text: str, size: int) -> list[dict]:
+    messages = []
+    for start in range(0, len(text), size):
+        messages.extend(parser.feed(text[start : start + size]))
+    return messages
+
+
+def test_messages_are_parsed_whatever_the_chunking():
+    text = "```json\n" + json.dumps(MESSAGES, indent=2) + "\n```"
+    for size in (1, 3, 7, len(text)):
+        parser = A2uiStreamParser()
+        assert feed_in_chunks(parser, text, size) == MESSAGES
+        assert parser.json_start == len("```json\n")
+
+
+def test_brackets_in_prose_before_the_json_are_skipped():
+    prose = 'Here is your project [see below] {as requested}: [1 of 2 ("draft"\n'
+    text = prose + json.dumps(MESSAGES)
+    for size in (1, 5, len(text)):
+        parser = A2uiStreamParser()
+        assert feed_in_chunks(parser, text, size) == MESSAGES
+        assert parser.json_start == len(prose)
+
+
+def test_json_that_is_not_a2ui_is_prose():
+    prose = 'The config is {"region": "us-east1"}. '
+    parser = A2uiStreamParser()
+
+    assert parser.feed(prose) == []
+    assert parser.json_start is None
+    assert parser.feed(json.dumps(MESSAGES[0])) == [MESSAGES[0]]
+    assert parser.json_start == len(prose)
+
+
+def test_concatenated_objects():
+    text = " ".join(json.dumps(message) for message in MESSAGES)
+
+    assert A2uiStreamParser().feed(text) == MESSAGES
+
+
+def stream_in_chunks(text: str, size: int) -> tuple[str, int]:
+    """Return the prose a2ui_callback streams and the A2UI parts it sends."""
+    context = SimpleNamespace(invocation_id="i", agent_name="a", state={})
+    prose, a2ui_parts = "", 0
+    for start in range(0, len(text), size):
+        chunk = text[start : start + size]
+        response = a2ui_callback(
+            context,
+            LlmResponse(
+                content=types.Content(parts=[types.Part(text=chunk)]), partial=True
+            ),
+        )
+        if response is None:
+            prose += chunk
+            continue
+        for part in (response.content.parts if response.content else []):
+            if part.text:
+                prose += part.text
+            else:
+                a2ui_parts += 1
+    a2ui_callback(
+        context, LlmResponse(content=types.Content(parts=[types.Part(text=text)]))
+    )
+    return prose, a2ui_parts
+
+
+def test_streamed_prose_keeps_json_that_is_not_a2ui():
+    prose = 'The config is {"region": "us-east1"}, see [this {"a": 1}]. '
+    for size in (1, 3, 7, len(prose) + 5):
+        assert stream_in_chunks(prose + json.dumps(MESSAGES), size) == (prose, 2)
+
+
+def test_streamed_prose_drops_the_fence_however_it_is_split():
+    text = "Here you go:\n```json\n" + json.dumps(MESSAGES, indent=2) + "\n```"
+    for size in (1, 2, 3, 5, 7):
+        assert stream_in_chunks(text, size) == ("Here you go:\n", 2)
@@ -0,0 +1,74 @@
+import pytest
+
+from a2ui_agent import resources
+from a2ui_agent.resources import ResourceIndex, get_resources
+
+ROWS = [
+    {"name": "api", "type": "Cloud Run", "region": "us-west1", "status": "healthy"},
+    {"name": "api", "type": "Cloud Run", "region": "us-east1", "status": "error"},
+    {"name": "api", "type": "GKE", "region": "us-east1", "status": "healthy"},
+    {"name": "db", "type": "Cloud SQL", "region": "us-east1", "status": "warning"},
+    {"name": "api", "type": "GKE", "region": "us-east1", "status": "warning"},
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = ResourceIndex(lambda: ROWS, ttl=3600)
+    monkeypatch.setattr(resources, "RESOURCE_INDEX", index)
+    return index
+
+
+def all_pages(limit: int, **filters) -> list[dict]:
+    rows, cursor = [], None
+    while True:
+        page = get_resources(
+            fields=["type", "status"], limit=limit, cursor=cursor, **filters
+        )
+        rows.extend(page["resources"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_keep_rows_that_share_a_name(index, limit):
+    rows = all_pages(limit)
+
+    assert len(rows) == len(ROWS)
+    assert [row["name"] for row in rows] == ["api"] * 4 + ["db"]
+    assert sorted(map(str, rows)) == sorted(
+        str({"name": r["name"], "type": r["type"], "status": r["status"]}) for r in ROWS
+    )
+
+
+def test_pages_with_filters(index):
+    rows = all_pages(1, region=["us-east1"], type=["GKE", "Cloud Run"])
+
+    assert [(row["type"], row["status"]) for row in rows] == [
+        ("Cloud Run", "error"),
+        ("GKE", "healthy"),
+        ("GKE", "warning"),
+    ]
+
+
+def test_repeated_filter_values_return_each_row_once(index):
+    page = get_resources(status=["healthy", "healthy"], type=["GKE", "GKE", "GKE"])
+
+    assert page["total"] == 1
+    assert len(page["resources"]) == 1
+
+
+def test_cursor_survives_a_refresh(index):
+    first = get_resources(limit=2)
+    index.refresh()
+
+    second = get_resources(limit=2, cursor=first["next_cursor"])
+
+    assert second["total"] == len(ROWS)
+    assert len(first["resources"]) + len(second["resources"]) == 4
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "eyJhZnRlciI6ICJhcGkifQ=="])
+def test_invalid_cursor(index, cursor):
+    assert get_resources(cursor=cursor)["status"] == "error"
@@ -0,0 +1,107 @@
+"""Benchmark batched trajectory scoring on a large regression set.
+
+Compares a per-invocation Python loop that builds a PerInvocationResult for
+every pair with score_tool_trajectories, with and without materializing the
+per-invocation results.
+
+Run from the adk-evaluation directory:
+
+    uv run python -m benchmarks.bench_batch_scoring
+"""
+
+import random
+import time
+from collections import Counter
+
+from google.adk.evaluation.eval_case import IntermediateData, Invocation
+from google.adk.evaluation.eval_metrics import EvalStatus
+from google.adk.evaluation.evaluator import PerInvocationResult
+from google.adk.evaluation.trajectory_evaluator import get_all_tool_calls
+from google.genai import types as genai_types
+
+from benchmarks.bench_custom_metrics import recursive_args_match_any
+from custom_metrics import score_tool_trajectories
+
+NUM_INVOCATIONS = 50_000
+TOOLS = [f"tool_{i}" for i in range(30)]
+_USER_CONTENT = genai_types.Content(parts=[genai_types.Part(text="User input.")])
+
+
+def invocation(names: list[str]) -> Invocation:
+    return Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(
+            tool_uses=[
+                genai_types.FunctionCall(name=name, args={"device_id": "ANY"})
+                for name in names
+            ]
+        ),
+    )
+
+
+def is_subsequence(expected: list[str], actual: list[str]) -> bool:
+    remaining = iter(actual)
+    return all(name in remaining for name in expected)
+
+
+def loop_scores(actual_invocations, expected_invocations) -> list:
+    results = []
+    for actual, expected in zip(actual_invocations, expected_invocations):
+        actual_calls = get_all_tool_calls(actual.intermediate_data)
+        expected_calls = get_all_tool_calls(expected.intermediate_data)
+        actual_names = [c.name for c in actual_calls]
+        expected_names = [c.name for c in expected_calls]
+        exact = len(actual_calls) == len(expected_calls) and all(
+            a.name == e.name and recursive_args_match_any(a.args, e.args)
+            for a, e in zip(actual_calls, expected_calls)
+        )
+        scores = (
+            exact,
+            actual_names[: len(expected_names)] == expected_names,
+            is_subsequence(expected_names, actual_names),
+            not Counter(expected_names) - Counter(actual_names),
+        )
+        results.append(
+            PerInvocationResult(
+                actual_invocation=actual,
+                expected_invocation=expected,
+                score=float(scores[0]),
+                eval_status=EvalStatus.PASSED if exact else EvalStatus.FAILED,
+            )
+        )
+    return results
+
+
+def main():
+    rng = random.Random(0)
+    expected_names = [
+        rng.sample(TOOLS, rng.randint(1, 4)) for _ in range(NUM_INVOCATIONS)
+    ]
+    actual_names = [
+        names if rng.random() < 0.7 else names + [rng.choice(TOOLS)]
+        for names in expected_names
+    ]
+    expected = [invocation(names) for names in expected_names]
+    actual = [invocation(names) for names in actual_names]
+    print(f"{NUM_INVOCATIONS} invocation pairs")
+
+    started = time.perf_counter()
+    loop_scores(actual, expected)
+    print(f"python loop with results:          {time.perf_counter() - started:.3f}s")
+
+    # The first run compiles the expected invocations; later num_runs
+    # repeats reuse them.
+    for run in ("first run", "next runs"):
+        started = time.perf_counter()
+        scores = score_tool_trajectories(actual, expected)
+        print(f"score_tool_trajectories, {run}: {time.perf_counter() - started:.3f}s")
+
+    started = time.perf_counter()
+    scores.evaluation_result()
+    print(f"  + materialize results:           {time.perf_counter() - started:.3f}s")
+    for match in ("exact", "prefix", "in_order", "any_order"):
+        print(f"  {match:<10} {scores.overall_score(match):.3f}")
+
+
+if __name__ == "__main__":
+    main()
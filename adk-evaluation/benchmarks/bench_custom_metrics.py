@@ -0,0 +1,132 @@
+"""Micro-benchmarks for args_any_support_tool_trajectory_metric.
+
+Compares the compiled, cached matcher with the previous recursive matcher on
+large JSON payloads and on many invocations scored over several runs.
+
+Run from the adk-evaluation directory:
+
+    uv run python -m benchmarks.bench_custom_metrics
+"""
+
+import timeit
+from unittest.mock import MagicMock
+
+from google.adk.evaluation.eval_case import IntermediateData, Invocation
+from google.adk.evaluation.eval_metrics import EvalMetric, EvalStatus
+from google.adk.evaluation.evaluator import PerInvocationResult
+from google.adk.evaluation.trajectory_evaluator import get_all_tool_calls
+from google.genai import types as genai_types
+
+from custom_metrics import (
+    _compile_args_matcher,
+    _match_args,
+    args_any_support_tool_trajectory_metric,
+)
+
+_USER_CONTENT = genai_types.Content(parts=[genai_types.Part(text="User input.")])
+
+
+def recursive_args_match_any(actual_args, expected_args) -> bool:
+    if expected_args == "ANY":
+        return True
+    if isinstance(expected_args, dict):
+        if not isinstance(actual_args, dict):
+            return False
+        if set(actual_args.keys()) != set(expected_args.keys()):
+            return False
+        for key, expected_value in expected_args.items():
+            if not recursive_args_match_any(actual_args.get(key), expected_value):
+                return False
+        return True
+    if isinstance(expected_args, list):
+        if not isinstance(actual_args, list):
+            return False
+        if len(actual_args) != len(expected_args):
+            return False
+        return all(
+            recursive_args_match_any(actual, expected)
+            for actual, expected in zip(actual_args, expected_args)
+        )
+    return actual_args == expected_args
+
+
+def recursive_metric(actual_invocations, expected_invocations) -> float:
+    score = 0.0
+    for actual, expected in zip(actual_invocations, expected_invocations):
+        actual_calls = get_all_tool_calls(actual.intermediate_data)
+        expected_calls = get_all_tool_calls(expected.intermediate_data)
+        matched = float(
+            len(actual_calls) == len(expected_calls)
+            and all(
+                a.name == e.name and recursive_args_match_any(a.args, e.args)
+                for a, e in zip(actual_calls, expected_calls)
+            )
+        )
+        PerInvocationResult(
+            actual_invocation=actual,
+            expected_invocation=expected,
+            score=matched,
+            eval_status=EvalStatus.PASSED if matched else EvalStatus.FAILED,
+        )
+        score += matched
+    return score / len(actual_invocations)
+
+
+def payload(rows: int, leaf) -> dict:
+    return {
+        "table": "devices",
+        "rows": [
+            {f"field_{j}": leaf if j % 5 == 0 else j for j in range(20)}
+            for _ in range(rows)
+        ],
+    }
+
+
+def invocation(args: dict) -> Invocation:
+    return Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(
+            tool_uses=[genai_types.FunctionCall(name="upsert_rows", args=args)]
+        ),
+    )
+
+
+def report(label: str, old: float, new: float) -> None:
+    print(f"{label:<40} {old * 1000:>10.3f} {new * 1000:>10.3f} {old / new:>7.1f}x")
+
+
+def main():
+    print(f"{'case':<40} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}")
+
+    actual_args, expected_args = payload(5_000, "value"), payload(5_000, "ANY")
+    matcher = _compile_args_matcher(expected_args)
+    number = 5
+    report(
+        "match one 5k-row payload",
+        timeit.timeit(
+            lambda: recursive_args_match_any(actual_args, expected_args),
+            number=number,
+        )
+        / number,
+        timeit.timeit(lambda: _match_args(matcher, actual_args), number=number)
+        / number,
+    )
+
+    eval_metric = MagicMock(spec=EvalMetric)
+    actual = [invocation(payload(20, "value")) for _ in range(2_000)]
+    expected = [invocation(payload(20, "ANY")) for _ in range(2_000)]
+    num_runs = 5
+    report(
+        f"2k invocations x {num_runs} runs",
+        timeit.timeit(lambda: recursive_metric(actual, expected), number=num_runs),
+        timeit.timeit(
+            lambda: args_any_support_tool_trajectory_metric(
+                eval_metric, actual, expected
+            ),
+            number=num_runs,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
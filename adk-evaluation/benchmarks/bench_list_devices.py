@@ -0,0 +1,69 @@
+"""Compare the linear DEVICE_DB scan with the indexed DeviceStore query.
+
+Run from the adk-evaluation directory:
+
+    uv run python -m benchmarks.bench_list_devices
+"""
+
+import random
+import timeit
+
+from home_automation_agent.device_store import DeviceStore
+
+LOCATIONS = ["Living Room", "Bedroom", "Kitchen", "Office", "Garage"]
+STATUSES = ["ON", "OFF"]
+
+
+def scan(device_db: dict, status: str = "", location: str = "") -> list:
+    devices = []
+    for device_id, info in device_db.items():
+        if ((not status) or info["status"] == status) and (
+            (not location) or info["location"] == location
+        ):
+            devices.append(
+                {
+                    "device_id": device_id,
+                    "status": info["status"],
+                    "location": info["location"],
+                }
+            )
+    return devices
+
+
+def make_fleet(size: int) -> dict:
+    rng = random.Random(0)
+    return {
+        f"device_{i}": {
+            "status": rng.choice(STATUSES),
+            "location": rng.choice(LOCATIONS),
+        }
+        for i in range(size)
+    }
+
+
+def main():
+    print(f"{'devices':>8} {'filter':>18} {'scan (ms)':>10} {'index (ms)':>11}")
+    for size in (1_000, 10_000, 50_000, 100_000):
+        device_db = make_fleet(size)
+        store = DeviceStore(device_db)
+        # Make one (status, location) pair rare, like a single broken unit.
+        store.put("device_broken", "ERROR", "Garage")
+        device_db["device_broken"] = {"status": "ERROR", "location": "Garage"}
+        for filters in (
+            {"location": "Kitchen"},
+            {"status": "ON", "location": "Kitchen"},
+            {"status": "ERROR", "location": "Garage"},
+        ):
+            assert scan(device_db, **filters) == store.query(**filters)
+            number = 20
+            scan_ms = timeit.timeit(lambda: scan(device_db, **filters), number=number)
+            index_ms = timeit.timeit(lambda: store.query(**filters), number=number)
+            label = "/".join(filters.values())
+            print(
+                f"{size:>8} {label:>18} {scan_ms / number * 1000:>10.3f}"
+                f" {index_ms / number * 1000:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the minute-wheel ScheduleEngine with 100k schedules.
+
+Compares "what is due in the next N minutes" against scanning a flat
+SCHEDULE_DB dict, and times one tick applying a minute's transitions.
+
+Run from the adk-evaluation directory:
+
+    uv run python -m benchmarks.bench_schedules
+"""
+
+import random
+import time
+import timeit
+
+from home_automation_agent.device_store import DeviceStore
+from home_automation_agent.schedule_engine import (
+    ScheduleEngine,
+    apply_due,
+    format_time,
+    parse_time,
+)
+from home_automation_agent.state import HomeState, VersionedDict
+
+NUM_SCHEDULES = 100_000
+
+
+def scan_due(schedule_db: dict, start: int, within: int) -> list:
+    due = []
+    for device_id, entry in schedule_db.items():
+        if (parse_time(entry["time"]) - start) % (24 * 60) < within:
+            due.append((device_id, entry["status"]))
+    return due
+
+
+def main():
+    rng = random.Random(0)
+    schedules = {
+        f"device_{i}": [
+            {
+                "time": format_time(rng.randrange(24 * 60)),
+                "status": rng.choice(["ON", "OFF"]),
+            }
+        ]
+        for i in range(NUM_SCHEDULES)
+    }
+    flat = {device_id: entries[0] for device_id, entries in schedules.items()}
+
+    started = time.perf_counter()
+    engine = ScheduleEngine(schedules)
+    print(f"build {NUM_SCHEDULES} schedules: {time.perf_counter() - started:.3f}s")
+
+    start = parse_time("18:00")
+    print(f"{'window (min)':>12} {'due':>6} {'scan (ms)':>10} {'wheel (ms)':>11}")
+    for within in (1, 15, 60):
+        assert len(scan_due(flat, start, within)) == len(engine.due(start, within))
+        number = 10
+        scan_ms = timeit.timeit(lambda: scan_due(flat, start, within), number=number)
+        wheel_ms = timeit.timeit(lambda: engine.due(start, within), number=number)
+        print(
+            f"{within:>12} {len(engine.due(start, within)):>6}"
+            f" {scan_ms / number * 1000:>10.3f} {wheel_ms / number * 1000:>11.3f}"
+        )
+
+    state = HomeState(
+        devices=DeviceStore(
+            {device_id: {"status": "OFF", "location": "Kitchen"} for device_id in flat}
+        ),
+        temperatures=VersionedDict(),
+        schedules=engine,
+        user_preferences=VersionedDict(),
+    )
+    started = time.perf_counter()
+    applied = apply_due(state, start, 1)
+    elapsed = time.perf_counter() - started
+    print(f"tick applying {applied} transitions: {elapsed * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
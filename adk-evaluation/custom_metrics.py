@@ -1,3 +1,9 @@
+import operator
+import weakref
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
 from google.adk.evaluation.eval_case import ConversationScenario, Invocation
 from google.adk.evaluation.eval_metrics import EvalMetric, EvalStatus
 from google.adk.evaluation.evaluator import EvaluationResult, PerInvocationResult
@@ -29,79 +35,266 @@ def args_any_support_tool_trajectory_metric(
         raise ValueError("expected_invocations is needed by this metric.")
     del conversation_scenario  # unused for per-invocation evaluation
 
-    total_tool_use_accuracy = 0.0
-    num_invocations = 0
-    per_invocation_results = []
+    scores = score_tool_trajectories(actual_invocations, expected_invocations)
+    return scores.evaluation_result()
 
-    for actual, expected in zip(actual_invocations, expected_invocations):
-        tool_use_accuracy = (
-            1.0 if _tool_calls_exact_match_any(actual, expected) else 0.0
-        )
-        per_invocation_results.append(
-            PerInvocationResult(
+
+@dataclass
+class TrajectoryScores:
+    """Tool trajectory scores for a set of (actual, expected) invocation pairs.
+
+    Each array holds one 0.0/1.0 score per pair:
+      - exact: same tool names in the same order, with args matching ("ANY"
+        in expected args matches anything).
+      - prefix: the expected tool names are a prefix of the actual ones.
+      - in_order: the expected tool names appear in the actual ones in order.
+      - any_order: every expected tool name appears in the actual ones, at
+        least as many times.
+
+    PerInvocationResult objects are only built when a report asks for them.
+    """
+
+    actual_invocations: list[Invocation]
+    expected_invocations: list[Invocation]
+    exact: np.ndarray
+    prefix: np.ndarray
+    in_order: np.ndarray
+    any_order: np.ndarray
+
+    def overall_score(self, match: str = "exact") -> float | None:
+        scores = getattr(self, match)
+        return float(scores.mean()) if len(scores) else None
+
+    def per_invocation_results(
+        self, match: str = "exact"
+    ) -> Iterator[PerInvocationResult]:
+        for actual, expected, score in zip(
+            self.actual_invocations,
+            self.expected_invocations,
+            getattr(self, match).tolist(),
+        ):
+            yield PerInvocationResult(
                 actual_invocation=actual,
                 expected_invocation=expected,
-                score=tool_use_accuracy,
-                eval_status=_get_eval_status(tool_use_accuracy),
+                score=score,
+                eval_status=_get_eval_status(score),
             )
-        )
-        total_tool_use_accuracy += tool_use_accuracy
-        num_invocations += 1
 
-    if per_invocation_results:
-        overall_score = total_tool_use_accuracy / num_invocations
+    def evaluation_result(self, match: str = "exact") -> EvaluationResult:
+        overall_score = self.overall_score(match)
+        if overall_score is None:
+            return EvaluationResult()
         return EvaluationResult(
             overall_score=overall_score,
             overall_eval_status=_get_eval_status(overall_score),
-            per_invocation_results=per_invocation_results,
+            per_invocation_results=list(self.per_invocation_results(match)),
         )
 
-    return EvaluationResult()
 
+def score_tool_trajectories(
+    actual_invocations: list[Invocation], expected_invocations: list[Invocation]
+) -> TrajectoryScores:
+    """Score every invocation pair at once.
 
-def _tool_calls_exact_match_any(
-    actual_invocation: Invocation, expected_invocation: Invocation
-) -> bool:
-    actual_tool_uses = get_all_tool_calls(actual_invocation.intermediate_data)
-    expected_tool_uses = get_all_tool_calls(expected_invocation.intermediate_data)
+    Tool names are integer-encoded into padded matrices so that name-based
+    scores are computed with NumPy over the whole set. Args are only matched
+    for the pairs whose names match exactly.
+    """
+    pairs = list(zip(actual_invocations, expected_invocations))
+    actual_invocations = [actual for actual, _ in pairs]
+    expected_invocations = [expected for _, expected in pairs]
+    actual_tool_uses = [
+        get_all_tool_calls(invocation.intermediate_data)
+        for invocation in actual_invocations
+    ]
+    expected_tool_uses = [
+        _compiled_expected_tool_calls(invocation) for invocation in expected_invocations
+    ]
 
-    if len(actual_tool_uses) != len(expected_tool_uses):
-        return False
+    vocabulary: dict[str, int] = {}
+    actual_names = [[tool.name for tool in tools] for tools in actual_tool_uses]
+    expected_names = [[name for name, _ in tools] for tools in expected_tool_uses]
+    width = max(map(len, actual_names + expected_names), default=0)
+    actual, actual_lengths = _encode_names(actual_names, vocabulary, width)
+    expected, expected_lengths = _encode_names(expected_names, vocabulary, width)
 
-    for actual, expected in zip(actual_tool_uses, expected_tool_uses):
-        if actual.name != expected.name:
-            return False
-        if not _args_match_any(actual.args, expected.args):
-            return False
+    # Padding is -1 in both matrices, so it only ever matches padding.
+    same_names = (actual == expected).all(axis=1)
+    exact = same_names & (actual_lengths == expected_lengths)
+    candidates = np.flatnonzero(exact).tolist()
+    exact[candidates] = [
+        all(
+            _match_args(matcher, tool.args)
+            for tool, (_, matcher) in zip(actual_tool_uses[i], expected_tool_uses[i])
+        )
+        for i in candidates
+    ]
+    prefix = ((actual == expected) | (expected == -1)).all(axis=1)
+
+    return TrajectoryScores(
+        actual_invocations=actual_invocations,
+        expected_invocations=expected_invocations,
+        exact=exact.astype(float),
+        prefix=prefix.astype(float),
+        in_order=_in_order(actual, expected).astype(float),
+        any_order=_any_order(actual, expected, len(vocabulary)).astype(float),
+    )
 
-    return True
 
+def _encode_names(
+    names: list[list[str]], vocabulary: dict[str, int], width: int
+) -> tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter(map(len, names), dtype=np.intp, count=len(names))
+    codes = [
+        vocabulary.setdefault(name, len(vocabulary)) for row in names for name in row
+    ]
+    encoded = np.full((len(names), width), -1, dtype=np.int32)
+    rows = np.repeat(np.arange(len(names)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    encoded[rows, np.arange(len(codes)) - starts] = codes
+    return encoded, lengths
 
-def _args_match_any(actual_args, expected_args) -> bool:
-    if expected_args == "ANY":
-        return True
 
-    if isinstance(expected_args, dict):
-        if not isinstance(actual_args, dict):
-            return False
-        if set(actual_args.keys()) != set(expected_args.keys()):
-            return False
-        for key, expected_value in expected_args.items():
-            if not _args_match_any(actual_args.get(key), expected_value):
-                return False
-        return True
-
-    if isinstance(expected_args, list):
-        if not isinstance(actual_args, list):
-            return False
-        if len(actual_args) != len(expected_args):
-            return False
-        return all(
-            _args_match_any(actual, expected)
-            for actual, expected in zip(actual_args, expected_args)
+def _in_order(actual: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    # Greedy subsequence match, one expected column at a time for all rows.
+    positions = np.arange(actual.shape[1])
+    next_position = np.zeros(len(actual), dtype=np.intp)
+    matched = np.ones(len(actual), dtype=bool)
+    for column in expected.T:
+        active = column != -1
+        if not active.any():
+            break
+        hits = (actual == column[:, None]) & (positions >= next_position[:, None])
+        found = hits.any(axis=1)
+        matched &= found | ~active
+        next_position = np.where(active & found, hits.argmax(axis=1) + 1, next_position)
+    return matched
+
+
+def _any_order(actual: np.ndarray, expected: np.ndarray, size: int) -> np.ndarray:
+    # Column 0 counts the -1 padding and is ignored.
+    rows = np.arange(len(actual))[:, None]
+    actual_counts = np.zeros((len(actual), size + 1), dtype=np.int32)
+    expected_counts = np.zeros((len(expected), size + 1), dtype=np.int32)
+    np.add.at(actual_counts, (rows, actual + 1), 1)
+    np.add.at(expected_counts, (rows, expected + 1), 1)
+    return (actual_counts[:, 1:] >= expected_counts[:, 1:]).all(axis=1)
+
+
+# Compiled expected tool calls, keyed by id() of the expected invocation. The
+# same expected invocations are scored once per run, so they are compiled once
+# and dropped when the invocation is garbage collected.
+_compiled_tool_calls: dict[int, tuple] = {}
+
+
+def _compiled_expected_tool_calls(expected_invocation: Invocation) -> tuple:
+    key = id(expected_invocation)
+    compiled = _compiled_tool_calls.get(key)
+    if compiled is None:
+        compiled = tuple(
+            (tool_call.name, _compile_args_matcher(tool_call.args))
+            for tool_call in get_all_tool_calls(expected_invocation.intermediate_data)
         )
+        _compiled_tool_calls[key] = compiled
+        weakref.finalize(expected_invocation, _compiled_tool_calls.pop, key, None)
+    return compiled
+
+
+_MATCH_ANY = 0
+_MATCH_EQUAL = 1
+_MATCH_DICT = 2
+_MATCH_LIST = 3
+# Comparing containers with == recurses in C, so only subtrees up to this
+# depth collapse into a _MATCH_EQUAL node; deeper ones keep container nodes.
+_MAX_EQUAL_DEPTH = 100
+
+
+def _compile_args_matcher(expected_args) -> tuple:
+    """Compile expected args into a matcher tree, where "ANY" matches anything.
+
+    Nodes are (_MATCH_ANY,), (_MATCH_EQUAL, value), or for containers
+    (_MATCH_DICT or _MATCH_LIST, keys or length, getter, values, nested):
+    `getter` fetches every child that must equal `values` in one call, and
+    `nested` lists (key, node) for the other children. Subtrees without
+    "ANY" and at most _MAX_EQUAL_DEPTH deep collapse into a single
+    _MATCH_EQUAL node.
+    """
+    if not isinstance(expected_args, (dict, list)):
+        return _compiled_node(expected_args, {})
+    # Post-order walk, so a container is compiled after its children.
+    compiled: dict[int, tuple] = {}
+    depths: dict[int, int] = {}
+    stack = [(expected_args, False)]
+    while stack:
+        expected, children_compiled = stack.pop()
+        if children_compiled:
+            compiled[id(expected)] = _compile_container(expected, compiled, depths)
+        elif isinstance(expected, (dict, list)):
+            stack.append((expected, True))
+            values = expected.values() if isinstance(expected, dict) else expected
+            stack.extend(
+                [(value, False) for value in values if isinstance(value, (dict, list))]
+            )
+    return _compiled_node(expected_args, compiled)
+
 
-    return actual_args == expected_args
+def _compiled_node(expected, compiled: dict[int, tuple]) -> tuple:
+    if isinstance(expected, (dict, list)):
+        return compiled[id(expected)]
+    if expected == "ANY":
+        return (_MATCH_ANY,)
+    return (_MATCH_EQUAL, expected)
+
+
+def _compile_container(
+    expected: dict | list, compiled: dict[int, tuple], depths: dict[int, int]
+) -> tuple:
+    items = expected.items() if isinstance(expected, dict) else enumerate(expected)
+    equal_keys, equal_values, nested = [], [], []
+    depth = 1
+    for key, value in items:
+        node = _compiled_node(value, compiled)
+        if isinstance(value, (dict, list)):
+            depth = max(depth, depths[id(value)] + 1)
+        if node[0] == _MATCH_EQUAL:
+            equal_keys.append(key)
+            equal_values.append(node[1])
+        elif node[0] != _MATCH_ANY:
+            nested.append((key, node))
+    depths[id(expected)] = depth
+    if len(equal_keys) == len(expected) and depth <= _MAX_EQUAL_DEPTH:
+        return (_MATCH_EQUAL, expected)
+
+    getter = operator.itemgetter(*equal_keys) if equal_keys else None
+    # itemgetter returns a bare value for one key and a tuple for several.
+    values = equal_values[0] if len(equal_values) == 1 else tuple(equal_values)
+    if isinstance(expected, dict):
+        return (_MATCH_DICT, frozenset(expected), getter, values, tuple(nested))
+    return (_MATCH_LIST, len(expected), getter, values, tuple(nested))
+
+
+def _match_args(matcher: tuple, actual_args) -> bool:
+    pending = []
+    node, actual = matcher, actual_args
+    while True:
+        kind = node[0]
+        if kind == _MATCH_EQUAL:
+            if actual != node[1]:
+                return False
+        elif kind != _MATCH_ANY:
+            if kind == _MATCH_DICT:
+                if not isinstance(actual, dict) or actual.keys() != node[1]:
+                    return False
+            elif not isinstance(actual, list) or len(actual) != node[1]:
+                return False
+            _, _, getter, values, nested = node
+            if getter is not None and getter(actual) != values:
+                return False
+            if nested:
+                pending.extend([(child, actual[key]) for key, child in nested])
+        if not pending:
+            return True
+        node, actual = pending.pop()
 
 
 def _get_eval_status(score: float) -> EvalStatus:
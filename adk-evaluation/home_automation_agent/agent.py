@@ -1,56 +1,104 @@
-from google.adk import Agent
-
-DEVICE_DB = {
-    "device_1": {"status": "ON", "location": "Living Room"},
-    "device_2": {"status": "OFF", "location": "Bedroom"},
-    "device_3": {"status": "OFF", "location": "Kitchen"},
-}
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-TEMPERATURE_DB = {
-    "Living Room": 22,
-    "Bedroom": 20,
-    "Kitchen": 24,
-}
-
-SCHEDULE_DB = {
-    "device_1": {"time": "18:00", "status": "ON"},
-    "device_2": {"time": "22:00", "status": "OFF"},
-}
+from google.adk import Agent
+from google.adk.agents.callback_context import CallbackContext
+
+from .device_store import DeviceStore
+from .schedule_engine import ScheduleEngine
+from .state import HomeState, VersionedDict
+
+logger = logging.getLogger(__name__)
+
+INITIAL_STATE = HomeState(
+    devices=DeviceStore(
+        {
+            "device_1": {"status": "ON", "location": "Living Room"},
+            "device_2": {"status": "OFF", "location": "Bedroom"},
+            "device_3": {"status": "OFF", "location": "Kitchen"},
+        }
+    ),
+    temperatures=VersionedDict(
+        {
+            "Living Room": 22,
+            "Bedroom": 20,
+            "Kitchen": 24,
+        }
+    ),
+    # Schedules are recorded only: see schedule_engine.run_schedules.
+    schedules=ScheduleEngine(
+        {
+            "device_1": [{"time": "18:00", "status": "ON"}],
+            "device_2": [{"time": "22:00", "status": "OFF"}],
+        }
+    ),
+    user_preferences=VersionedDict(
+        {
+            "user_x": {"preferred_temp": 21, "location": "Bedroom"},
+            "user_x": {"preferred_temp": 21, "location": "Living Room"},
+            "user_y": {"preferred_temp": 23, "location": "Living Room"},
+        }
+    ),
+)
 
-USER_PREFERENCES_DB = {
-    "user_x": {"preferred_temp": 21, "location": "Bedroom"},
-    "user_x": {"preferred_temp": 21, "location": "Living Room"},
-    "user_y": {"preferred_temp": 23, "location": "Living Room"},
-}
+# Tools read and write the state bound to the current context. Each session
+# gets its own fork of INITIAL_STATE; code outside a session shares one.
+_default_state = INITIAL_STATE.fork()
+_current_state: ContextVar[HomeState] = ContextVar("home_state", default=_default_state)
+_session_states: OrderedDict[str, HomeState] = OrderedDict()
+MAX_SESSION_STATES = 1024
+
+
+def current_state() -> HomeState:
+    return _current_state.get()
+
+
+@contextmanager
+def use_state(state: HomeState):
+    """Bind `state` for the tools called inside the `with` block."""
+    token = _current_state.set(state)
+    try:
+        yield state
+    finally:
+        _current_state.reset(token)
+
+
+def bind_session_state(callback_context: CallbackContext) -> None:
+    """Bind a per-session fork of INITIAL_STATE before the agent runs."""
+    session_id = callback_context.session.id
+    state = _session_states.pop(session_id, None) or INITIAL_STATE.fork()
+    _session_states[session_id] = state
+    if len(_session_states) > MAX_SESSION_STATES:
+        # ADK has no session-end hook, so the least recently used session is
+        # dropped; if it comes back, it starts again from INITIAL_STATE.
+        evicted, _ = _session_states.popitem(last=False)
+        logger.warning(
+            "More than %d sessions are active: the state of session %s was "
+            "dropped and will restart from the initial state.",
+            MAX_SESSION_STATES,
+            evicted,
+        )
+    _current_state.set(state)
 
 
 def reset_data():
-    global DEVICE_DB
-    global TEMPERATURE_DB
-    global SCHEDULE_DB
-    global USER_PREFERENCES_DB
-    DEVICE_DB = {
-        "device_1": {"status": "ON", "location": "Living Room"},
-        "device_2": {"status": "OFF", "location": "Bedroom"},
-        "device_3": {"status": "OFF", "location": "Kitchen"},
-    }
-
-    TEMPERATURE_DB = {
-        "Living Room": 22,
-        "Bedroom": 20,
-        "Kitchen": 24,
-    }
+    """Roll the current state back to the point it was forked (O(changed keys))."""
+    current_state().reset()
 
-    SCHEDULE_DB = {
-        "device_1": {"time": "18:00", "status": "ON"},
-        "device_2": {"time": "22:00", "status": "OFF"},
-    }
 
-    USER_PREFERENCES_DB = {
-        "user_x": {"preferred_temp": 21, "location": "Bedroom"},
-        "user_x": {"preferred_temp": 21, "location": "Living Room"},
-        "user_y": {"preferred_temp": 23, "location": "Living Room"},
+def __getattr__(name: str):
+    # Keep DEVICE_DB and friends readable as module attributes.
+    tables = {
+        "DEVICE_DB": "devices",
+        "TEMPERATURE_DB": "temperatures",
+        "SCHEDULE_DB": "schedules",
+        "USER_PREFERENCES_DB": "user_preferences",
     }
+    if name in tables:
+        return getattr(current_state(), tables[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_device_info(device_id: str) -> dict:
@@ -66,7 +114,7 @@ def get_device_info(device_id: str) -> dict:
           - location: The location where the device is installed (e.g., 'Living
           Room', 'Bedroom', ''Kitchen')
     """
-    return DEVICE_DB.get(device_id, "Device not found")
+    return current_state().devices.get(device_id, "Device not found")
 
 
 def set_device_info(device_id: str, status: str = "", location: str = "") -> str:
@@ -84,12 +132,13 @@ def set_device_info(device_id: str, status: str = "", location: str = "") -> str
         str: A message indicating whether the device information was successfully
         updated.
     """
-    if device_id in DEVICE_DB:
+    devices = current_state().devices
+    if device_id in devices:
         if status:
-            DEVICE_DB[device_id]["status"] = status
+            devices.update(device_id, status=status)
             return f"Device {device_id} information updated: status -> {status}."
         if location:
-            DEVICE_DB[device_id]["location"] = location
+            devices.update(device_id, location=location)
             return f"Device {device_id} information updated: location -> {location}."
     return "Device not found"
 
@@ -105,7 +154,7 @@ def get_temperature(location: str) -> int:
         int: The current temperature in celsius in the specified location, or
         'Location not found' if the location does not exist.
     """
-    return TEMPERATURE_DB.get(location, "Location not found")
+    return current_state().temperatures.get(location, "Location not found")
 
 
 def set_temperature(location: str, temperature: int) -> str:
@@ -122,8 +171,9 @@ def set_temperature(location: str, temperature: int) -> str:
     Returns:
         str: A message indicating whether the temperature was successfully set.
     """
-    if location in TEMPERATURE_DB:
-        TEMPERATURE_DB[location] = temperature
+    temperatures = current_state().temperatures
+    if location in temperatures:
+        temperatures[location] = temperature
         return f"Temperature in {location} set to {temperature}°C."
     return "Location not found"
 
@@ -142,11 +192,14 @@ def get_user_preferences(user_id: str) -> dict:
           - preferred_temp: The user's preferred temperature.
           - location: The location where the user prefers to be.
     """
-    return USER_PREFERENCES_DB.get(user_id, "User not found")
+    return current_state().user_preferences.get(user_id, "User not found")
 
 
 def set_device_schedule(device_id: str, time: str, status: str) -> str:
-    """Schedule a device to change its status at a specific time.
+    """Schedule a device to change its status at a specific time every day.
+
+    A device can have several schedules at different times. Scheduling the same
+    device at the same time again replaces the status for that time.
 
     Args:
         device_id (str): The unique identifier of the device.
@@ -158,8 +211,12 @@ def set_device_schedule(device_id: str, time: str, status: str) -> str:
     Returns:
         str: A message indicating whether the schedule was successfully set.
     """
-    if device_id in DEVICE_DB:
-        SCHEDULE_DB[device_id] = {"time": time, "status": status}
+    state = current_state()
+    if device_id in state.devices:
+        try:
+            state.schedules.set(device_id, time, status)
+        except ValueError as e:
+            return str(e)
         return f"Device {device_id} scheduled to turn {status} at {time}."
     return "Device not found"
 
@@ -167,6 +224,9 @@ def set_device_schedule(device_id: str, time: str, status: str) -> str:
 def get_device_schedule(device_id: str) -> dict:
     """Retrieve the schedule of a device.
 
+    If the device has several schedules, this is the earliest one in the day;
+    use get_device_schedules to get all of them.
+
     Args:
         device_id (str): The unique identifier of the device.
 
@@ -178,7 +238,25 @@ def get_device_schedule(device_id: str) -> dict:
           - status: The status that will be set at the scheduled time (e.g., 'ON',
           'OFF').
     """
-    return SCHEDULE_DB.get(device_id, "Schedule not found")
+    schedules = current_state().schedules.get(device_id)
+    return schedules[0] if schedules else "Schedule not found"
+
+
+def get_device_schedules(device_id: str) -> list:
+    """Retrieve all the schedules of a device.
+
+    Args:
+        device_id (str): The unique identifier of the device.
+
+    Returns:
+        list: A list of dictionaries ordered by time, or 'Schedule not found' if
+        the device has no schedule. Each dictionary contains:
+          - time: The scheduled time for the device to change its status (format:
+          'HH:MM').
+          - status: The status that will be set at the scheduled time (e.g., 'ON',
+          'OFF').
+    """
+    return current_state().schedules.get(device_id, "Schedule not found")
 
 
 def celsius_to_fahrenheit(celsius: int) -> float:
@@ -227,27 +305,194 @@ def list_devices(status: str = "", location: str = "") -> list:
         list: A list of dictionaries, each containing the device ID, status, and
         location, or an empty list if no devices match the criteria.
     """
-    devices = []
-    for device_id, info in DEVICE_DB.items():
-        if ((not status) or info["status"] == status) and (
-            (not location) or info["location"] == location
-        ):
-            devices.append(
-                {
-                    "device_id": device_id,
-                    "status": info["status"],
-                    "location": info["location"],
-                }
-            )
+    devices = current_state().devices.query(status=status, location=location)
     return devices if devices else "No devices found matching the criteria."
 
 
+DEVICE_STATUSES = ("ON", "OFF")
+
+
+def _error(message: str) -> dict:
+    return {"status": "error", "message": message, "results": []}
+
+
+def _check_status(status: str, current_status: str = "") -> str | None:
+    """Return an error message if a status is not one of DEVICE_STATUSES."""
+    for value in (status, current_status):
+        if value and value not in DEVICE_STATUSES:
+            return f"Invalid status {value!r}, expected 'ON' or 'OFF'."
+    if not status:
+        return "A status is required."
+    return None
+
+
+def _select_devices(
+    state: HomeState,
+    device_ids: list[str] | None,
+    locations: list[str] | None,
+    current_status: str,
+) -> list[str]:
+    devices = state.devices
+    if device_ids:
+        # Unknown ids are kept, so that they are reported as not found.
+        return [
+            device_id
+            for device_id in dict.fromkeys(device_ids)
+            if (device := devices.get(device_id)) is None
+            or (not locations or device["location"] in locations)
+            and (not current_status or device["status"] == current_status)
+        ]
+    if not locations:
+        if not current_status:
+            return []
+        return [d["device_id"] for d in devices.query(status=current_status)]
+    return [
+        d["device_id"]
+        for location in dict.fromkeys(locations)
+        for d in devices.query(status=current_status, location=location)
+    ]
+
+
+def _apply_all(state: HomeState, key: str, targets: list[str], apply) -> dict:
+    """Apply `apply` to every target, or to none of them if any fails."""
+    if not targets:
+        return _error("No matching targets.")
+    snapshot = state.snapshot()
+    results = [{key: target, "result": apply(target)} for target in targets]
+    failed = [r for r in results if r["result"] is not None]
+    if failed:
+        state.restore(snapshot)
+        for r in results:
+            r["result"] = r["result"] or "Not applied."
+        return {
+            "status": "error",
+            "message": f"{len(failed)} of {len(results)} failed; nothing was changed.",
+            "results": results,
+        }
+    for r in results:
+        r["result"] = "OK"
+    return {"status": "ok", "results": results}
+
+
+def set_devices_status(
+    status: str,
+    device_ids: list[str] | None = None,
+    locations: list[str] | None = None,
+    current_status: str = "",
+) -> dict:
+    """Set the status of many AC devices in a single call.
+
+    Use this instead of calling set_device_info once per device. Target devices
+    by device_ids, locations and/or current_status; at least one of them is
+    required. With device_ids, locations and current_status only keep the
+    listed devices that match them. To update every device, list all of their
+    locations. All devices are updated or none is.
+
+    Args:
+        status (str): The new status. Accepted values: 'ON', 'OFF'.
+        device_ids (list[str], optional): The devices to update.
+        locations (list[str], optional): Update the devices in these locations
+          (e.g., 'Living Room', 'Bedroom', 'Kitchen').
+        current_status (str, optional): Only update devices currently in this
+          status.
+
+    Returns:
+        dict: 'status' is 'ok' or 'error', and 'results' lists each device with
+        its own result.
+    """
+    if message := _check_status(status, current_status):
+        return _error(message)
+    if not (device_ids or locations or current_status):
+        return _error("Give device_ids, locations or current_status.")
+    state = current_state()
+    devices = state.devices
+
+    def apply(device_id: str) -> str | None:
+        if device_id not in devices:
+            return "Device not found"
+        devices.update(device_id, status=status)
+
+    targets = _select_devices(state, device_ids, locations, current_status)
+    return _apply_all(state, "device_id", targets, apply)
+
+
+def set_temperatures(locations: list[str], temperature: int) -> dict:
+    """Set the same desired temperature in celsius for several locations at once.
+
+    Acceptable range of temperature: 18-30 celsius. If it's out of the range, do
+    not call this tool. All locations are updated or none is.
+
+    Args:
+        locations (list[str]): The locations where the temperature should be set.
+        temperature (int): The desired temperature as integer to set in celsius.
+
+    Returns:
+        dict: 'status' is 'ok' or 'error', and 'results' lists each location
+        with its own result.
+    """
+    state = current_state()
+    temperatures = state.temperatures
+
+    def apply(location: str) -> str | None:
+        if location not in temperatures:
+            return "Location not found"
+        temperatures[location] = temperature
+
+    return _apply_all(state, "location", list(dict.fromkeys(locations)), apply)
+
+
+def set_devices_schedule(
+    time: str,
+    status: str,
+    device_ids: list[str] | None = None,
+    locations: list[str] | None = None,
+) -> dict:
+    """Schedule many devices to change their status at the same time every day.
+
+    Target devices by device_ids and/or locations; one of them is required.
+    With both, only the listed devices in those locations are scheduled. All
+    schedules are set or none is.
+
+    Args:
+        time (str): The time at which the devices should change their status
+          (format: 'HH:MM').
+        status (str): The status to set at the specified time. Accepted
+          values: 'ON', 'OFF'.
+        device_ids (list[str], optional): The devices to schedule.
+        locations (list[str], optional): Schedule the devices in these
+          locations.
+
+    Returns:
+        dict: 'status' is 'ok' or 'error', and 'results' lists each device with
+        its own result.
+    """
+    if message := _check_status(status):
+        return _error(message)
+    if not (device_ids or locations):
+        return _error("Give device_ids or locations.")
+    state = current_state()
+
+    def apply(device_id: str) -> str | None:
+        if device_id not in state.devices:
+            return "Device not found"
+        try:
+            state.schedules.set(device_id, time, status)
+        except ValueError as e:
+            return str(e)
+
+    targets = _select_devices(state, device_ids, locations, "")
+    return _apply_all(state, "device_id", targets, apply)
+
+
 root_agent = Agent(
     model="gemini-2.5-flash",
     name="Home_automation_agent",
     instruction="""
     You are Home Automation Agent. You are responsible for controlling the devices in the home.
+    When a request changes several devices or locations, use the batch tools
+    (set_devices_status, set_temperatures, set_devices_schedule) in one call.
     """,
+    before_agent_callback=bind_session_state,
     tools=[
         get_device_info,
         set_device_info,
@@ -256,8 +501,12 @@ root_agent = Agent(
         get_user_preferences,
         set_device_schedule,
         get_device_schedule,
+        get_device_schedules,
         celsius_to_fahrenheit,
         fahrenheit_to_celsius,
         list_devices,
+        set_devices_status,
+        set_temperatures,
+        set_devices_schedule,
     ],
 )
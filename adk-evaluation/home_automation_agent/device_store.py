@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from .state import VersionedDict
+
+
+class DeviceStore:
+    """AC device records with secondary indexes on status and location.
+
+    Each index maps a key to an insertion-ordered dict of device ID -> record,
+    so a filtered query only touches the devices it returns. Records live in a
+    VersionedDict: the index over the shared base is built once and reused by
+    every fork, and each fork only indexes the devices it changed.
+    """
+
+    def __init__(self, devices: dict[str, dict] | None = None):
+        self._records = VersionedDict(
+            {
+                device_id: {"status": info["status"], "location": info["location"]}
+                for device_id, info in (devices or {}).items()
+            }
+        )
+        self._base_index = _Index(self._records.base)
+        self._local_index = _Index()
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, device_id: str, default=None):
+        info = self._records.get(device_id)
+        return dict(info) if info is not None else default
+
+    def put(self, device_id: str, status: str, location: str) -> None:
+        if self._records.is_changed(device_id):
+            self._local_index.remove(device_id, self._records[device_id])
+        info = {"status": status, "location": location}
+        self._records[device_id] = info
+        self._local_index.add(device_id, info)
+
+    def update(self, device_id: str, status: str = "", location: str = "") -> None:
+        info = self._records[device_id]
+        self.put(device_id, status or info["status"], location or info["location"])
+
+    def query(self, status: str = "", location: str = "") -> list[dict]:
+        changed = self._local_index.devices
+        devices = [
+            {
+                "device_id": device_id,
+                "status": info["status"],
+                "location": info["location"],
+            }
+            for device_id, info in self._base_index.bucket(status, location).items()
+            if device_id not in changed
+        ]
+        devices.extend(
+            {
+                "device_id": device_id,
+                "status": info["status"],
+                "location": info["location"],
+            }
+            for device_id, info in self._local_index.bucket(status, location).items()
+        )
+        return devices
+
+    def fork(self) -> "DeviceStore":
+        child = DeviceStore.__new__(DeviceStore)
+        child._records = self._records.fork()
+        child._base_index = self._base_index
+        child._local_index = _Index(child._records.changes)
+        return child
+
+    def snapshot(self) -> int:
+        return self._records.snapshot()
+
+    def restore(self, version: int) -> None:
+        device_ids = self._records.changed_since(version)
+        for device_id in device_ids:
+            if self._records.is_changed(device_id):
+                self._local_index.remove(device_id, self._records[device_id])
+        self._records.restore(version)
+        for device_id in device_ids:
+            if self._records.is_changed(device_id):
+                self._local_index.add(device_id, self._records[device_id])
+
+
+class _Index:
+    def __init__(self, devices: dict[str, dict] | None = None):
+        self.devices: dict[str, dict] = {}
+        self._by_status: dict[str, dict[str, dict]] = defaultdict(dict)
+        self._by_location: dict[str, dict[str, dict]] = defaultdict(dict)
+        self._by_status_location: dict[tuple[str, str], dict[str, dict]] = (
+            defaultdict(dict)
+        )
+        for device_id, info in (devices or {}).items():
+            self.add(device_id, info)
+
+    def add(self, device_id: str, info: dict) -> None:
+        status, location = info["status"], info["location"]
+        self.devices[device_id] = info
+        self._by_status[status][device_id] = info
+        self._by_location[location][device_id] = info
+        self._by_status_location[status, location][device_id] = info
+
+    def remove(self, device_id: str, info: dict) -> None:
+        status, location = info["status"], info["location"]
+        del self.devices[device_id]
+        _discard(self._by_status, status, device_id)
+        _discard(self._by_location, location, device_id)
+        _discard(self._by_status_location, (status, location), device_id)
+
+    def bucket(self, status: str = "", location: str = "") -> dict[str, dict]:
+        if status and location:
+            return self._by_status_location.get((status, location), {})
+        if status:
+            return self._by_status.get(status, {})
+        if location:
+            return self._by_location.get(location, {})
+        return self.devices
+
+
+def _discard(index: dict, key, device_id: str) -> None:
+    bucket = index[key]
+    del bucket[device_id]
+    if not bucket:
+        del index[key]
@@ -0,0 +1,189 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .state import VersionedDict
+
+if TYPE_CHECKING:
+    from .state import HomeState
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_time(time: str) -> int:
+    """Convert 'HH:MM' to the minute of the day."""
+    hours, _, minutes = time.partition(":")
+    if not (
+        hours.isdigit()
+        and minutes.isdigit()
+        and len(minutes) == 2
+        and int(hours) < 24
+        and int(minutes) < 60
+    ):
+        raise ValueError(f"Invalid time {time!r}, expected 'HH:MM'.")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_time(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class ScheduleEngine:
+    """Daily device schedules on a minute-of-day wheel.
+
+    A device can have one schedule per minute of the day. The wheel maps each
+    minute to the schedules that fire in it, so "what is due in the next N
+    minutes" touches at most N buckets, whatever the number of schedules. Like
+    DeviceStore, the wheel over the shared base is built once and each fork
+    only indexes the devices whose schedules it changed.
+    """
+
+    def __init__(self, schedules: dict[str, list[dict]] | None = None):
+        self._by_device = VersionedDict(
+            {
+                device_id: {
+                    parse_time(entry["time"]): entry["status"] for entry in entries
+                }
+                for device_id, entries in (schedules or {}).items()
+            }
+        )
+        self._base_wheel = _Wheel(self._by_device.base)
+        self._local_wheel = _Wheel()
+
+    def __contains__(self, device_id: str) -> bool:
+        return bool(self._by_device.get(device_id))
+
+    def get(self, device_id: str, default=None):
+        entries = self._by_device.get(device_id)
+        if not entries:
+            return default
+        return [
+            {"time": format_time(minute), "status": entries[minute]}
+            for minute in sorted(entries)
+        ]
+
+    def set(self, device_id: str, time: str, status: str) -> None:
+        minute = parse_time(time)
+        entries = dict(self._by_device.get(device_id, {}))
+        entries[minute] = status
+        self._replace(device_id, entries)
+
+    def remove(self, device_id: str, time: str) -> bool:
+        minute = parse_time(time)
+        entries = dict(self._by_device.get(device_id, {}))
+        if entries.pop(minute, None) is None:
+            return False
+        self._replace(device_id, entries)
+        return True
+
+    def due(self, start: int, within: int) -> list[tuple[int, str, str]]:
+        """Return (minute, device_id, status) firing in [start, start + within).
+
+        Minutes wrap around midnight; the result is ordered by firing time.
+        """
+        changed = self._local_wheel.devices
+        due = []
+        for offset in range(min(within, MINUTES_PER_DAY)):
+            minute = (start + offset) % MINUTES_PER_DAY
+            due.extend(
+                (minute, device_id, status)
+                for device_id, status in self._base_wheel.bucket(minute).items()
+                if device_id not in changed
+            )
+            due.extend(
+                (minute, device_id, status)
+                for device_id, status in self._local_wheel.bucket(minute).items()
+            )
+        return due
+
+    def fork(self) -> "ScheduleEngine":
+        child = ScheduleEngine.__new__(ScheduleEngine)
+        child._by_device = self._by_device.fork()
+        child._base_wheel = self._base_wheel
+        child._local_wheel = _Wheel(child._by_device.changes)
+        return child
+
+    def snapshot(self) -> int:
+        return self._by_device.snapshot()
+
+    def restore(self, version: int) -> None:
+        device_ids = self._by_device.changed_since(version)
+        for device_id in device_ids:
+            self._local_wheel.remove(device_id)
+        self._by_device.restore(version)
+        for device_id in device_ids:
+            if self._by_device.is_changed(device_id):
+                self._local_wheel.add(device_id, self._by_device[device_id])
+
+    def _replace(self, device_id: str, entries: dict[int, str]) -> None:
+        self._local_wheel.remove(device_id)
+        self._by_device[device_id] = entries
+        self._local_wheel.add(device_id, entries)
+
+
+class _Wheel:
+    def __init__(self, schedules: dict[str, dict[int, str]] | None = None):
+        self.devices: dict[str, dict[int, str]] = {}
+        self._buckets: dict[int, dict[str, str]] = defaultdict(dict)
+        for device_id, entries in (schedules or {}).items():
+            self.add(device_id, entries)
+
+    def add(self, device_id: str, entries: dict[int, str]) -> None:
+        self.devices[device_id] = entries
+        for minute, status in entries.items():
+            self._buckets[minute][device_id] = status
+
+    def remove(self, device_id: str) -> None:
+        entries = self.devices.pop(device_id, {})
+        for minute in entries:
+            bucket = self._buckets[minute]
+            del bucket[device_id]
+            if not bucket:
+                del self._buckets[minute]
+
+    def bucket(self, minute: int) -> dict[str, str]:
+        return self._buckets.get(minute, {})
+
+
+def apply_due(state: "HomeState", start: int, within: int) -> int:
+    """Apply the schedules due in [start, start + within) to the device store.
+
+    Returns the number of device transitions applied.
+    """
+    devices = state.devices
+    applied = 0
+    for _, device_id, status in state.schedules.due(start, within):
+        if device_id in devices:
+            devices.update(device_id, status=status)
+            applied += 1
+    return applied
+
+
+async def run_schedules(
+    state: "HomeState",
+    interval: float = 60.0,
+    now: Callable[[], datetime] = datetime.now,
+) -> None:
+    """Apply due schedules to `state` every `interval` seconds until cancelled.
+
+    Each tick applies every schedule between the previous tick (exclusive) and
+    the current minute (inclusive) in one batch, so a late tick does not skip
+    transitions.
+
+    Nothing in the agent starts this loop: the agent only records schedules,
+    and device statuses do not change on their own during a session or an
+    eval. An app that wants schedules to fire runs it as a task next to the
+    agent, once per state, e.g. ``asyncio.create_task(run_schedules(state))``.
+    """
+    current = now()
+    last = current.hour * 60 + current.minute
+    while True:
+        await asyncio.sleep(interval)
+        current = now()
+        minute = current.hour * 60 + current.minute
+        elapsed = (minute - last) % MINUTES_PER_DAY
+        if elapsed:
+            apply_due(state, last + 1, elapsed)
+            last = minute
@@ -0,0 +1,134 @@
+from collections.abc import Iterator, Mapping, MutableMapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .device_store import DeviceStore
+    from .schedule_engine import ScheduleEngine
+
+_MISSING = object()
+_DELETED = object()
+
+# HomeState.snapshot() of a state that has not been written to since it was
+# created or forked.
+INITIAL_VERSION = (0, 0, 0, 0)
+
+
+class VersionedDict(MutableMapping):
+    """Copy-on-write dict over a base mapping shared between forks.
+
+    Writes land in a private overlay and are journaled, so ``snapshot()`` is
+    O(1) and ``restore()`` is O(keys written since the snapshot). Values are
+    shared with the base too: replace them instead of mutating them in place.
+    """
+
+    def __init__(self, base: Mapping | None = None):
+        self._base = dict(base or {})
+        self._local: dict = {}
+        self._journal: list[tuple] = []
+
+    @property
+    def base(self) -> Mapping:
+        return MappingProxyType(self._base)
+
+    @property
+    def changes(self) -> Mapping:
+        """Overlay entries; deleted keys are not included."""
+        return {k: v for k, v in self._local.items() if v is not _DELETED}
+
+    def is_changed(self, key) -> bool:
+        return key in self._local
+
+    def fork(self) -> "VersionedDict":
+        """Return an independent copy that shares the base (O(changed keys))."""
+        child = VersionedDict.__new__(VersionedDict)
+        child._base = self._base
+        child._local = dict(self._local)
+        child._journal = []
+        return child
+
+    def snapshot(self) -> int:
+        return len(self._journal)
+
+    def changed_since(self, version: int) -> set:
+        return {key for key, _ in self._journal[version:]}
+
+    def restore(self, version: int) -> None:
+        while len(self._journal) > version:
+            key, previous = self._journal.pop()
+            if previous is _MISSING:
+                del self._local[key]
+            else:
+                self._local[key] = previous
+
+    def __getitem__(self, key):
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            return self._base[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        self._journal.append((key, self._local.get(key, _MISSING)))
+        self._local[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self[key] = _DELETED
+
+    def __contains__(self, key) -> bool:
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            return key in self._base
+        return value is not _DELETED
+
+    def __iter__(self) -> Iterator:
+        for key in self._base:
+            if self._local.get(key) is not _DELETED:
+                yield key
+        for key, value in self._local.items():
+            if key not in self._base and value is not _DELETED:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+@dataclass
+class HomeState:
+    """The four home automation tables, forked and restored together."""
+
+    devices: "DeviceStore"
+    temperatures: VersionedDict
+    schedules: "ScheduleEngine"
+    user_preferences: VersionedDict
+
+    def fork(self) -> "HomeState":
+        return HomeState(
+            devices=self.devices.fork(),
+            temperatures=self.temperatures.fork(),
+            schedules=self.schedules.fork(),
+            user_preferences=self.user_preferences.fork(),
+        )
+
+    def snapshot(self) -> tuple[int, int, int, int]:
+        return (
+            self.devices.snapshot(),
+            self.temperatures.snapshot(),
+            self.schedules.snapshot(),
+            self.user_preferences.snapshot(),
+        )
+
+    def reset(self) -> None:
+        """Roll back every write since the state was created or forked."""
+        self.restore(INITIAL_VERSION)
+
+    def restore(self, snapshot: tuple[int, int, int, int]) -> None:
+        devices, temperatures, schedules, user_preferences = snapshot
+        self.devices.restore(devices)
+        self.temperatures.restore(temperatures)
+        self.schedules.restore(schedules)
+        self.user_preferences.restore(user_preferences)
@@ -0,0 +1,184 @@
+"""On-disk cache of eval inference results.
+
+Entries are keyed by a hash of the agent definition, the eval case and the run
+index, so re-scoring an eval set with a changed metric reuses the previous
+inferences instead of calling the model again. The cache is bounded in bytes
+and evicts the least recently used entries.
+
+The cache is opt-in: replayed inferences hide changes the fingerprint does not
+cover, such as a new model version behind the same name or an ADK upgrade.
+Set INFERENCE_CACHE_DIR to use it in the eval tests, e.g.
+
+    INFERENCE_CACHE_DIR=.inference_cache uv run pytest
+
+Usage:
+
+    uv run python -m inference_cache stats
+    uv run python -m inference_cache clear
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.evaluation.base_eval_service import InferenceResult, InferenceStatus
+from google.adk.evaluation.eval_case import EvalCase
+from pydantic import ValidationError
+
+DEFAULT_CACHE_DIR = ".inference_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_DIR_ENV = "INFERENCE_CACHE_DIR"
+
+
+class InferenceCache:
+    def __init__(
+        self,
+        directory: str | os.PathLike = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: dict[Path, tuple[float, int]] | None = None
+
+    @classmethod
+    def from_env(cls) -> "InferenceCache | None":
+        """Return a cache in $INFERENCE_CACHE_DIR, or None when it is not set."""
+        directory = os.environ.get(CACHE_DIR_ENV)
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def key(agent_fingerprint: str, eval_case: EvalCase, run_index: int) -> str:
+        digest = hashlib.sha256()
+        digest.update(agent_fingerprint.encode())
+        digest.update(eval_case.model_dump_json().encode())
+        digest.update(str(run_index).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> InferenceResult | None:
+        """Return the cached result, or None if it is missing or unreadable."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            inference_result = InferenceResult.model_validate_json(data)
+        except OSError:
+            return None
+        except ValidationError:
+            # A truncated or corrupt entry is a miss; the next put replaces it.
+            self._index().pop(path, None)
+            path.unlink(missing_ok=True)
+            return None
+        path.touch()
+        self._index()[path] = (path.stat().st_mtime, len(data))
+        return inference_result
+
+    def put(self, key: str, inference_result: InferenceResult) -> None:
+        if inference_result.status != InferenceStatus.SUCCESS:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = inference_result.model_dump_json().encode()
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self._index()[path] = (path.stat().st_mtime, len(data))
+        self._evict()
+
+    def clear(self) -> int:
+        """Delete every entry and return how many were removed."""
+        entries = self._index()
+        for path in entries:
+            path.unlink(missing_ok=True)
+        removed = len(entries)
+        entries.clear()
+        return removed
+
+    def size(self) -> tuple[int, int]:
+        """Return (number of entries, total bytes)."""
+        entries = self._index()
+        return len(entries), sum(size for _, size in entries.values())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _index(self) -> dict[Path, tuple[float, int]]:
+        if self._entries is None:
+            self._entries = {}
+            for path in self.directory.glob("*/*.json"):
+                stat = path.stat()
+                self._entries[path] = (stat.st_mtime, stat.st_size)
+        return self._entries
+
+    def _evict(self) -> None:
+        entries = self._index()
+        total = sum(size for _, size in entries.values())
+        if total <= self.max_bytes:
+            return
+        for path in sorted(entries, key=lambda p: entries[p][0]):
+            _, size = entries.pop(path)
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def agent_fingerprint(agent: BaseAgent, agent_module: str) -> str:
+    """Hash what decides an agent's behavior: its config and its source code.
+
+    Covers the model, instructions and tools of the agent tree, plus the
+    source of `agent_module` (every Python file when it is a package), so
+    editing a tool body or the data it reads changes the fingerprint.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(_describe_agent(agent), sort_keys=True).encode())
+    module = importlib.import_module(agent_module)
+    if hasattr(module, "__path__"):
+        paths = sorted(Path(module.__file__).parent.rglob("*.py"))
+    else:
+        paths = [Path(module.__file__)]
+    for path in paths:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _describe_agent(agent: BaseAgent) -> dict:
+    return {
+        "class": type(agent).__qualname__,
+        "name": agent.name,
+        "model": str(getattr(agent, "model", "")),
+        "instruction": _describe(getattr(agent, "instruction", "")),
+        "tools": [_describe(tool) for tool in getattr(agent, "tools", [])],
+        "sub_agents": [_describe_agent(sub_agent) for sub_agent in agent.sub_agents],
+    }
+
+
+def _describe(value) -> str:
+    func = getattr(value, "func", value)
+    if not callable(func):
+        return str(value)
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return getattr(func, "__qualname__", type(func).__qualname__)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    cache = InferenceCache(args.dir)
+    if args.command == "clear":
+        print(f"Removed {cache.clear()} cached inferences from {args.dir}.")
+    else:
+        entries, total = cache.size()
+        print(f"{entries} cached inferences, {total} bytes in {args.dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import pytest
+
+from home_automation_agent import agent
+
+
+@pytest.fixture(autouse=True)
+def state():
+    with agent.use_state(agent.INITIAL_STATE.fork()) as state:
+        yield state
+
+
+def test_set_devices_status_by_locations():
+    result = agent.set_devices_status("ON", locations=["Bedroom", "Kitchen"])
+
+    assert result == {
+        "status": "ok",
+        "results": [
+            {"device_id": "device_2", "result": "OK"},
+            {"device_id": "device_3", "result": "OK"},
+        ],
+    }
+    assert [d["device_id"] for d in agent.list_devices(status="ON")] == [
+        "device_1",
+        "device_2",
+        "device_3",
+    ]
+
+
+def test_set_devices_status_by_current_status():
+    result = agent.set_devices_status("OFF", current_status="ON")
+
+    assert result["results"] == [{"device_id": "device_1", "result": "OK"}]
+    assert agent.list_devices(status="ON") == (
+        "No devices found matching the criteria."
+    )
+
+
+def test_set_devices_status_filters_device_ids():
+    result = agent.set_devices_status(
+        "OFF", device_ids=["device_1", "device_2"], current_status="ON"
+    )
+    assert result["results"] == [{"device_id": "device_1", "result": "OK"}]
+
+    result = agent.set_devices_status(
+        "ON", device_ids=["device_1", "device_3"], locations=["Kitchen"]
+    )
+    assert result["results"] == [{"device_id": "device_3", "result": "OK"}]
+    assert agent.get_device_info("device_1")["status"] == "OFF"
+
+    result = agent.set_devices_status(
+        "ON", device_ids=["device_3"], current_status="OFF"
+    )
+    assert result["message"] == "No matching targets."
+
+
+def test_set_devices_status_is_atomic():
+    result = agent.set_devices_status("ON", device_ids=["device_2", "device_9"])
+
+    assert result["status"] == "error"
+    assert result["results"] == [
+        {"device_id": "device_2", "result": "Not applied."},
+        {"device_id": "device_9", "result": "Device not found"},
+    ]
+    assert agent.get_device_info("device_2")["status"] == "OFF"
+
+
+def test_set_temperatures():
+    assert agent.set_temperatures(["Bedroom", "Kitchen"], 21)["status"] == "ok"
+    assert agent.get_temperature("Bedroom") == 21
+    assert agent.get_temperature("Kitchen") == 21
+
+    result = agent.set_temperatures(["Bedroom", "Garage"], 25)
+    assert result["status"] == "error"
+    assert agent.get_temperature("Bedroom") == 21
+
+
+def test_set_devices_schedule_is_atomic():
+    assert agent.set_devices_schedule("07:00", "ON", locations=["Kitchen"]) == {
+        "status": "ok",
+        "results": [{"device_id": "device_3", "result": "OK"}],
+    }
+    assert agent.get_device_schedule("device_3") == {"time": "07:00", "status": "ON"}
+
+    result = agent.set_devices_schedule("7am", "OFF", device_ids=["device_3"])
+    assert result["status"] == "error"
+    assert agent.get_device_schedule("device_3") == {"time": "07:00", "status": "ON"}
+
+
+def test_no_matching_targets():
+    result = agent.set_devices_status("ON", locations=["Garage"])
+    assert result == {
+        "status": "error",
+        "message": "No matching targets.",
+        "results": [],
+    }
+
+
+def test_a_target_is_required():
+    assert agent.set_devices_status("OFF") == {
+        "status": "error",
+        "message": "Give device_ids, locations or current_status.",
+        "results": [],
+    }
+    assert agent.set_devices_schedule("07:00", "ON")["status"] == "error"
+    assert agent.get_device_info("device_1")["status"] == "ON"
+    assert agent.get_device_schedule("device_3") == "Schedule not found"
+
+
+def test_status_is_validated():
+    result = agent.set_devices_status("off", locations=["Kitchen"])
+    assert result["message"] == "Invalid status 'off', expected 'ON' or 'OFF'."
+    assert agent.set_devices_status("ON", current_status="on")["status"] == "error"
+    assert agent.set_devices_schedule("07:00", "", locations=["Kitchen"]) == {
+        "status": "error",
+        "message": "A status is required.",
+        "results": [],
+    }
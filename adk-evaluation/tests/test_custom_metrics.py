@@ -1,3 +1,4 @@
+import sys
 from unittest.mock import MagicMock
 
 import pytest
@@ -5,7 +6,11 @@ from google.adk.evaluation.eval_case import IntermediateData, Invocation
 from google.adk.evaluation.eval_metrics import EvalMetric, EvalStatus
 from google.genai import types as genai_types
 
-from custom_metrics import args_any_support_tool_trajectory_metric
+import custom_metrics
+from custom_metrics import (
+    args_any_support_tool_trajectory_metric,
+    score_tool_trajectories,
+)
 
 _USER_CONTENT = genai_types.Content(parts=[genai_types.Part(text="User input here.")])
 
@@ -157,3 +162,176 @@ def test_evaluate_invocations_different_tool_call_args_any_support(eval_metric):
     assert result.overall_eval_status == EvalStatus.PASSED
     assert result.per_invocation_results[0].score == 1.0
     assert result.per_invocation_results[0].eval_status == EvalStatus.PASSED
+
+
+def test_evaluate_invocations_nested_args_any_support(eval_metric):
+    actual_tool_call = genai_types.FunctionCall(
+        name="test_func",
+        args={"rows": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}], "n": 2},
+    )
+    expected_tool_call = genai_types.FunctionCall(
+        name="test_func",
+        args={"rows": [{"id": 1, "name": "ANY"}, "ANY"], "n": 2},
+    )
+    mismatched_tool_call = genai_types.FunctionCall(
+        name="test_func",
+        args={"rows": [{"id": 1}, "ANY"], "n": 2},
+    )
+    actual_invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(tool_uses=[actual_tool_call]),
+    )
+    expected_invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(tool_uses=[expected_tool_call]),
+    )
+    mismatched_invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(tool_uses=[mismatched_tool_call]),
+    )
+    result = args_any_support_tool_trajectory_metric(
+        eval_metric,
+        [actual_invocation, actual_invocation],
+        [expected_invocation, mismatched_invocation],
+    )
+    assert result.per_invocation_results[0].score == 1.0
+    assert result.per_invocation_results[1].score == 0.0
+
+
+def test_evaluate_invocations_deeply_nested_args(eval_metric):
+    def nested(depth, leaf):
+        value = leaf
+        for _ in range(depth):
+            value = {"child": [value]}
+        return value
+
+    depth = sys.getrecursionlimit() * 2
+    actual_invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(
+            tool_uses=[
+                genai_types.FunctionCall.model_construct(
+                    name="test_func", args=nested(depth, "leaf")
+                )
+            ]
+        ),
+    )
+    expected_invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(
+            tool_uses=[
+                genai_types.FunctionCall.model_construct(
+                    name="test_func", args=nested(depth, "ANY")
+                )
+            ]
+        ),
+    )
+    result = args_any_support_tool_trajectory_metric(
+        eval_metric, [actual_invocation], [expected_invocation]
+    )
+    assert result.overall_score == 1.0
+
+
+@pytest.mark.parametrize(("actual_leaf", "score"), [("leaf", 1.0), ("other", 0.0)])
+def test_evaluate_invocations_deeply_nested_args_without_any(
+    eval_metric, actual_leaf, score
+):
+    def nested(depth, leaf):
+        value = leaf
+        for _ in range(depth):
+            value = {"child": [value]}
+        return value
+
+    # Deeper than == on nested containers can go, which is not bounded by
+    # sys.getrecursionlimit().
+    depth = 20_000
+
+    def invocation(leaf):
+        return Invocation(
+            user_content=_USER_CONTENT,
+            intermediate_data=IntermediateData(
+                tool_uses=[
+                    genai_types.FunctionCall.model_construct(
+                        name="test_func", args=nested(depth, leaf)
+                    )
+                ]
+            ),
+        )
+
+    result = args_any_support_tool_trajectory_metric(
+        eval_metric, [invocation(actual_leaf)], [invocation("leaf")]
+    )
+    assert result.overall_score == score
+
+
+def test_expected_invocation_is_compiled_once(eval_metric, monkeypatch):
+    tool_call = genai_types.FunctionCall(name="test_func", args={"arg1": "ANY"})
+    invocation = Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(tool_uses=[tool_call]),
+    )
+    compile_calls = []
+    compile_args_matcher = custom_metrics._compile_args_matcher
+    monkeypatch.setattr(
+        custom_metrics,
+        "_compile_args_matcher",
+        lambda args: compile_calls.append(args) or compile_args_matcher(args),
+    )
+
+    for _ in range(3):  # num_runs
+        result = args_any_support_tool_trajectory_metric(
+            eval_metric, [invocation], [invocation]
+        )
+        assert result.overall_score == 1.0
+
+    assert compile_calls == [{"arg1": "ANY"}]
+
+
+def _invocation(*names, args=None):
+    return Invocation(
+        user_content=_USER_CONTENT,
+        intermediate_data=IntermediateData(
+            tool_uses=[
+                genai_types.FunctionCall(name=name, args=args or {}) for name in names
+            ]
+        ),
+    )
+
+
+def test_score_tool_trajectories_partial_matches():
+    actual = [
+        _invocation("a", "b", "c"),
+        _invocation("a", "x", "b"),
+        _invocation("b", "a"),
+        _invocation("a"),
+        _invocation(),
+    ]
+    expected = [
+        _invocation("a", "b", "c"),
+        _invocation("a", "b"),
+        _invocation("a", "b"),
+        _invocation("a", "a"),
+        _invocation(),
+    ]
+    scores = score_tool_trajectories(actual, expected)
+
+    assert scores.exact.tolist() == [1.0, 0.0, 0.0, 0.0, 1.0]
+    assert scores.prefix.tolist() == [1.0, 0.0, 0.0, 0.0, 1.0]
+    assert scores.in_order.tolist() == [1.0, 1.0, 0.0, 0.0, 1.0]
+    assert scores.any_order.tolist() == [1.0, 1.0, 1.0, 0.0, 1.0]
+    assert scores.overall_score("in_order") == 0.6
+
+
+def test_score_tool_trajectories_builds_results_lazily():
+    scores = score_tool_trajectories(
+        [_invocation("a", args={"x": 1}), _invocation("a", "b")],
+        [_invocation("a", args={"x": "ANY"}), _invocation("a")],
+    )
+
+    assert scores.exact.tolist() == [1.0, 0.0]
+    assert scores.prefix.tolist() == [1.0, 1.0]
+    results = scores.per_invocation_results("prefix")
+    assert next(results).eval_status == EvalStatus.PASSED
+    result = scores.evaluation_result()
+    assert result.overall_score == 0.5
+    assert [r.score for r in result.per_invocation_results] == [1.0, 0.0]
@@ -0,0 +1,52 @@
+from home_automation_agent.device_store import DeviceStore
+
+
+def _store():
+    return DeviceStore(
+        {
+            "device_1": {"status": "ON", "location": "Living Room"},
+            "device_2": {"status": "OFF", "location": "Bedroom"},
+            "device_3": {"status": "OFF", "location": "Kitchen"},
+        }
+    )
+
+
+def test_query_without_filters_returns_all_devices():
+    assert _store().query() == [
+        {"device_id": "device_1", "status": "ON", "location": "Living Room"},
+        {"device_id": "device_2", "status": "OFF", "location": "Bedroom"},
+        {"device_id": "device_3", "status": "OFF", "location": "Kitchen"},
+    ]
+
+
+def test_query_by_status_and_location():
+    store = _store()
+    assert [d["device_id"] for d in store.query(status="OFF")] == [
+        "device_2",
+        "device_3",
+    ]
+    assert [d["device_id"] for d in store.query(location="Kitchen")] == ["device_3"]
+    assert store.query(status="ON", location="Kitchen") == []
+
+
+def test_update_moves_device_between_indexes():
+    store = _store()
+    store.update("device_3", status="ON")
+    store.update("device_2", location="Kitchen")
+
+    assert [d["device_id"] for d in store.query(status="ON")] == [
+        "device_1",
+        "device_3",
+    ]
+    assert [d["device_id"] for d in store.query(status="OFF")] == ["device_2"]
+    assert [
+        d["device_id"] for d in store.query(status="OFF", location="Kitchen")
+    ] == ["device_2"]
+    assert store.query(location="Bedroom") == []
+
+
+def test_get_returns_a_copy():
+    store = _store()
+    store.get("device_1")["status"] = "OFF"
+    assert store.get("device_1") == {"status": "ON", "location": "Living Room"}
+    assert store.get("device_9", "Device not found") == "Device not found"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import os.path
 from typing import Optional
@@ -13,6 +14,7 @@ from google.adk.evaluation.base_eval_service import (
     EvaluateRequest,
     InferenceConfig,
     InferenceRequest,
+    InferenceResult,
 )
 from google.adk.evaluation.custom_metric_evaluator import _CustomMetricEvaluator
 from google.adk.evaluation.eval_config import EvalConfig, get_eval_metrics_from_config
@@ -27,6 +29,8 @@ from google.adk.evaluation.simulation.user_simulator_provider import (
 )
 from google.adk.runners import Aclosing
 
+from inference_cache import InferenceCache, agent_fingerprint
+
 
 @pytest.mark.skip(reason="`adk eval` only supports custom metrics")
 @pytest.mark.asyncio
@@ -47,6 +51,17 @@ async def test_with_single_test_file_workaround():
     )
 
 
+@pytest.mark.asyncio
+async def test_batch_request_uses_one_tool_call():
+    # Without the batch tools this request needs list_devices plus one
+    # set_device_info call per device.
+    await CustomMetricsSupportAgentEvaluator.evaluate(
+        agent_module="home_automation_agent",
+        eval_dataset_file_path_or_dir="tests/fixtures/args_any_support/batch_test.test.json",
+        num_runs=1,
+    )
+
+
 class CustomMetricsSupportAgentEvaluator(AgentEvaluator):
     @staticmethod
     async def evaluate_eval_set(
@@ -57,8 +72,17 @@ class CustomMetricsSupportAgentEvaluator(AgentEvaluator):
         num_runs: int = NUM_RUNS,
         agent_name: Optional[str] = None,
         print_detailed_results: bool = True,
+        max_concurrency: int = 8,
+        inference_cache: Optional[InferenceCache] = None,
     ):
-        """Evaluates an agent using the given EvalSet with custom metrics."""
+        """Evaluates an agent using the given EvalSet with custom metrics.
+
+        Up to `max_concurrency` eval cases (counting each run separately) are
+        inferred at the same time. With an `inference_cache`, runs whose agent
+        and eval case are unchanged reuse the cached inference and only the
+        metrics are recomputed. It defaults to InferenceCache.from_env(), so
+        the cache is only used when INFERENCE_CACHE_DIR is set.
+        """
         if criteria:
             base_criteria = {k: BaseCriterion(threshold=v) for k, v in criteria.items()}
             eval_config = EvalConfig(criteria=base_criteria)
@@ -100,35 +124,60 @@ class CustomMetricsSupportAgentEvaluator(AgentEvaluator):
             metric_evaluator_registry=metric_evaluator_registry,
         )
 
-        inference_requests = [
-            InferenceRequest(
-                app_name=app_name,
-                eval_set_id=eval_set.eval_set_id,
-                inference_config=InferenceConfig(),
-            )
-        ] * num_runs  # Repeat inference request num_runs times.
+        # Each (eval case, run) pair is inferred in its own task and scored as
+        # soon as its inference finishes. Every inference gets a new session,
+        # so the agent's per-session state keeps concurrent cases apart.
+        semaphore = asyncio.Semaphore(max_concurrency)
+        if inference_cache is None:
+            inference_cache = InferenceCache.from_env()
+        if inference_cache is not None:
+            fingerprint = agent_fingerprint(agent_for_eval, agent_module)
+
+        async def infer(eval_case_id: str) -> list[InferenceResult]:
+            async with semaphore:
+                inference_request = InferenceRequest(
+                    app_name=app_name,
+                    eval_set_id=eval_set.eval_set_id,
+                    eval_case_ids=[eval_case_id],
+                    inference_config=InferenceConfig(parallelism=1),
+                )
+                async with Aclosing(
+                    eval_service.perform_inference(inference_request=inference_request)
+                ) as agen:
+                    return [inference_result async for inference_result in agen]
 
-        # Generate inferences
-        inference_results = []
-        for inference_request in inference_requests:
+        async def run_eval_case(eval_case, run_index: int) -> list[EvalCaseResult]:
+            if inference_cache is None:
+                inference_results = await infer(eval_case.eval_id)
+            else:
+                key = InferenceCache.key(fingerprint, eval_case, run_index)
+                cached = inference_cache.get(key)
+                if cached is not None:
+                    inference_results = [cached]
+                else:
+                    inference_results = await infer(eval_case.eval_id)
+                    for inference_result in inference_results:
+                        inference_cache.put(key, inference_result)
+
+            evaluate_request = EvaluateRequest(
+                inference_results=inference_results,
+                evaluate_config=EvaluateConfig(eval_metrics=eval_metrics),
+            )
             async with Aclosing(
-                eval_service.perform_inference(inference_request=inference_request)
+                eval_service.evaluate(evaluate_request=evaluate_request)
             ) as agen:
-                async for inference_result in agen:
-                    inference_results.append(inference_result)
+                return [eval_result async for eval_result in agen]
 
-        # Evaluate metrics
         # As we perform more than one run for an eval case, we collect eval results
         # by eval id.
         eval_results_by_eval_id: dict[str, list[EvalCaseResult]] = {}
-        evaluate_request = EvaluateRequest(
-            inference_results=inference_results,
-            evaluate_config=EvaluateConfig(eval_metrics=eval_metrics),
-        )
-        async with Aclosing(
-            eval_service.evaluate(evaluate_request=evaluate_request)
-        ) as agen:
-            async for eval_result in agen:
+        eval_case_runs = [
+            run_eval_case(eval_case, run_index)
+            for run_index in range(num_runs)
+            for eval_case in eval_set.eval_cases
+        ]
+        for eval_case_run in asyncio.as_completed(eval_case_runs):
+            for eval_result in await eval_case_run:
                 eval_id = eval_result.eval_id
                 if eval_id not in eval_results_by_eval_id:
                     eval_results_by_eval_id[eval_id] = []
@@ -168,6 +217,8 @@ class CustomMetricsSupportAgentEvaluator(AgentEvaluator):
         agent_name: Optional[str] = None,
         initial_session_file: Optional[str] = None,
         print_detailed_results: bool = True,
+        max_concurrency: int = 8,
+        inference_cache: Optional[InferenceCache] = None,
     ):
         """Evaluates an Agent given eval data with custom metrics."""
         test_files = []
@@ -200,4 +251,6 @@ class CustomMetricsSupportAgentEvaluator(AgentEvaluator):
                 num_runs=num_runs,
                 agent_name=agent_name,
                 print_detailed_results=print_detailed_results,
+                max_concurrency=max_concurrency,
+                inference_cache=inference_cache,
             )
@@ -0,0 +1,94 @@
+import os
+
+from google.adk.evaluation.base_eval_service import InferenceResult, InferenceStatus
+from google.adk.evaluation.eval_case import EvalCase
+
+from home_automation_agent.agent import root_agent
+from inference_cache import CACHE_DIR_ENV, InferenceCache, agent_fingerprint
+
+
+def make_result(eval_case_id: str, status=InferenceStatus.SUCCESS):
+    return InferenceResult(
+        app_name="test_app",
+        eval_set_id="set",
+        eval_case_id=eval_case_id,
+        inferences=[],
+        session_id="session",
+        status=status,
+    )
+
+
+def test_put_then_get_round_trips(tmp_path):
+    cache = InferenceCache(tmp_path)
+    key = InferenceCache.key("agent", EvalCase(eval_id="case", conversation=[]), 0)
+
+    assert cache.get(key) is None
+    cache.put(key, make_result("case"))
+
+    assert InferenceCache(tmp_path).get(key) == make_result("case")
+
+
+def test_key_depends_on_run_index_and_eval_case():
+    case = EvalCase(eval_id="case", conversation=[])
+    other = EvalCase(eval_id="other", conversation=[])
+
+    assert InferenceCache.key("agent", case, 0) != InferenceCache.key("agent", case, 1)
+    assert InferenceCache.key("agent", case, 0) != InferenceCache.key("agent", other, 0)
+
+
+def test_failed_inferences_are_not_cached(tmp_path):
+    cache = InferenceCache(tmp_path)
+    cache.put("ab" * 32, make_result("case", status=InferenceStatus.FAILURE))
+
+    assert cache.size() == (0, 0)
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = InferenceCache(tmp_path)
+    key = "ab" * 32
+    cache.put(key, make_result("case"))
+    cache._path(key).write_bytes(b'{"app_name": "test_')
+
+    assert cache.get(key) is None
+    assert cache.size() == (0, 0)
+    cache.put(key, make_result("case"))
+    assert cache.get(key) == make_result("case")
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv(CACHE_DIR_ENV, raising=False)
+    assert InferenceCache.from_env() is None
+
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    assert InferenceCache.from_env().directory == tmp_path
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = InferenceCache(tmp_path)
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, make_result(f"case{i}"))
+        os.utime(cache._path(key), (i, i))
+    _, total = cache.size()
+
+    cache = InferenceCache(tmp_path, max_bytes=total - 1)
+    cache.get(keys[0])
+    cache.put(keys[2], make_result("case2"))
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_clear_removes_every_entry(tmp_path):
+    cache = InferenceCache(tmp_path)
+    cache.put("ab" * 32, make_result("case"))
+
+    assert cache.clear() == 1
+    assert InferenceCache(tmp_path).size() == (0, 0)
+
+
+def test_agent_fingerprint_is_stable():
+    assert agent_fingerprint(root_agent, "home_automation_agent") == agent_fingerprint(
+        root_agent, "home_automation_agent"
+    )
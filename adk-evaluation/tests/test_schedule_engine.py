@@ -0,0 +1,115 @@
+import asyncio
+import itertools
+from datetime import datetime
+
+import pytest
+
+from home_automation_agent import agent
+from home_automation_agent.schedule_engine import (
+    ScheduleEngine,
+    apply_due,
+    parse_time,
+    run_schedules,
+)
+
+
+def test_parse_time_rejects_invalid_values():
+    assert parse_time("00:00") == 0
+    assert parse_time("18:05") == 18 * 60 + 5
+    for time in ("24:00", "12:60", "1230", "ab:cd", "12:5"):
+        with pytest.raises(ValueError):
+            parse_time(time)
+
+
+def test_many_schedules_per_device():
+    engine = ScheduleEngine({"device_1": [{"time": "18:00", "status": "ON"}]})
+    engine.set("device_1", "07:30", "OFF")
+    engine.set("device_1", "18:00", "OFF")
+
+    assert engine.get("device_1") == [
+        {"time": "07:30", "status": "OFF"},
+        {"time": "18:00", "status": "OFF"},
+    ]
+    assert engine.remove("device_1", "07:30")
+    assert not engine.remove("device_1", "07:30")
+    assert engine.get("device_1") == [{"time": "18:00", "status": "OFF"}]
+
+
+def test_due_wraps_around_midnight_in_firing_order():
+    engine = ScheduleEngine(
+        {
+            "device_1": [{"time": "23:58", "status": "ON"}],
+            "device_2": [{"time": "00:01", "status": "OFF"}],
+            "device_3": [{"time": "12:00", "status": "ON"}],
+        }
+    )
+    assert engine.due(parse_time("23:55"), 10) == [
+        (parse_time("23:58"), "device_1", "ON"),
+        (parse_time("00:01"), "device_2", "OFF"),
+    ]
+
+
+def test_due_reflects_changes_in_fork_and_restore():
+    engine = ScheduleEngine({"device_1": [{"time": "18:00", "status": "ON"}]})
+    fork = engine.fork()
+    version = fork.snapshot()
+    fork.set("device_1", "18:10", "OFF")
+    fork.remove("device_1", "18:00")
+
+    assert fork.due(parse_time("18:00"), 60) == [
+        (parse_time("18:10"), "device_1", "OFF")
+    ]
+    assert engine.due(parse_time("18:00"), 60) == [
+        (parse_time("18:00"), "device_1", "ON")
+    ]
+
+    fork.restore(version)
+
+    assert fork.due(parse_time("18:00"), 60) == [
+        (parse_time("18:00"), "device_1", "ON")
+    ]
+
+
+def test_apply_due_updates_device_store():
+    state = agent.INITIAL_STATE.fork()
+    applied = apply_due(state, parse_time("17:00"), 6 * 60)
+
+    assert applied == 2
+    assert state.devices.get("device_1")["status"] == "ON"
+    assert state.devices.get("device_2")["status"] == "OFF"
+
+
+def test_run_schedules_applies_transitions_since_last_tick():
+    state = agent.INITIAL_STATE.fork()
+    state.schedules.set("device_3", "09:01", "ON")
+    times = itertools.chain(
+        [datetime(2026, 1, 1, 9, 0)], itertools.repeat(datetime(2026, 1, 1, 9, 2))
+    )
+
+    async def main():
+        task = asyncio.create_task(run_schedules(state, interval=0, now=times.__next__))
+        while state.devices.get("device_3")["status"] != "ON":
+            await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), timeout=1))
+
+
+def test_set_device_schedule_tool():
+    with agent.use_state(agent.INITIAL_STATE.fork()):
+        assert agent.set_device_schedule("device_3", "07:00", "ON") == (
+            "Device device_3 scheduled to turn ON at 07:00."
+        )
+        assert agent.set_device_schedule("device_3", "06:30", "OFF") == (
+            "Device device_3 scheduled to turn OFF at 06:30."
+        )
+        assert agent.get_device_schedules("device_3") == [
+            {"time": "06:30", "status": "OFF"},
+            {"time": "07:00", "status": "ON"},
+        ]
+        assert agent.get_device_schedule("device_3") == {
+            "time": "06:30",
+            "status": "OFF",
+        }
+        assert agent.get_device_schedule("device_9") == "Schedule not found"
+        assert "Invalid time" in agent.set_device_schedule("device_3", "7pm", "ON")
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from home_automation_agent import agent
+from home_automation_agent.device_store import DeviceStore
+from home_automation_agent.state import INITIAL_VERSION, VersionedDict
+
+
+def test_versioned_dict_restore_rolls_back_writes_and_deletes():
+    data = VersionedDict({"a": 1, "b": 2})
+    version = data.snapshot()
+    data["a"] = 10
+    data["c"] = 3
+    del data["b"]
+    assert dict(data) == {"a": 10, "c": 3}
+
+    data.restore(version)
+
+    assert dict(data) == {"a": 1, "b": 2}
+    assert data.changes == {}
+
+
+def test_versioned_dict_forks_are_isolated():
+    parent = VersionedDict({"a": 1})
+    parent["b"] = 2
+    child = parent.fork()
+    child["a"] = 100
+    parent["b"] = 20
+
+    assert dict(parent) == {"a": 1, "b": 20}
+    assert dict(child) == {"a": 100, "b": 2}
+
+
+def test_device_store_restore_reindexes_changed_devices():
+    store = DeviceStore(
+        {
+            "device_1": {"status": "ON", "location": "Living Room"},
+            "device_2": {"status": "OFF", "location": "Bedroom"},
+        }
+    )
+    version = store.snapshot()
+    store.update("device_2", status="ON")
+    store.update("device_2", location="Kitchen")
+    assert [d["device_id"] for d in store.query(status="ON")] == [
+        "device_1",
+        "device_2",
+    ]
+
+    store.restore(version)
+
+    assert [d["device_id"] for d in store.query(status="ON")] == ["device_1"]
+    assert store.query(location="Kitchen") == []
+    assert store.get("device_2") == {"status": "OFF", "location": "Bedroom"}
+
+
+def test_tools_only_see_the_bound_state():
+    fork = agent.INITIAL_STATE.fork()
+    with agent.use_state(fork):
+        agent.set_device_info("device_2", status="ON")
+        agent.set_temperature("Bedroom", 25)
+        assert agent.get_device_info("device_2")["status"] == "ON"
+
+    assert agent.get_device_info("device_2")["status"] == "OFF"
+    assert agent.get_temperature("Bedroom") == 20
+
+    with agent.use_state(fork):
+        agent.reset_data()
+        assert agent.get_device_info("device_2")["status"] == "OFF"
+        assert agent.get_temperature("Bedroom") == 20
+
+
+def test_concurrent_cases_run_on_their_own_forks():
+    async def run_case(status):
+        with agent.use_state(agent.INITIAL_STATE.fork()):
+            agent.set_device_info("device_3", status=status)
+            await asyncio.sleep(0)
+            return agent.get_device_info("device_3")["status"]
+
+    async def main():
+        return await asyncio.gather(run_case("ON"), run_case("OFF"))
+
+    assert asyncio.run(main()) == ["ON", "OFF"]
+
+
+def test_reset_rolls_back_every_table():
+    state = agent.INITIAL_STATE.fork()
+    state.devices.update("device_2", status="ON")
+    state.temperatures["Bedroom"] = 25
+    state.schedules.set("device_3", "07:00", "ON")
+
+    state.reset()
+
+    assert state.snapshot() == INITIAL_VERSION
+    assert state.devices.get("device_2")["status"] == "OFF"
+    assert state.temperatures["Bedroom"] == 20
+    assert "device_3" not in state.schedules
+
+
+def test_evicting_a_session_state_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(agent, "MAX_SESSION_STATES", 1)
+    monkeypatch.setattr(agent, "_session_states", type(agent._session_states)())
+
+    def bind(session_id):
+        agent.bind_session_state(
+            SimpleNamespace(session=SimpleNamespace(id=session_id))
+        )
+
+    with caplog.at_level(logging.WARNING, logger=agent.__name__):
+        bind("a")
+        bind("a")
+        assert not caplog.records
+        bind("b")
+
+    assert list(agent._session_states) == ["b"]
+    assert "session a was dropped" in caplog.text
@@ -1,8 +1,11 @@
+import os
+
 from google.adk.agents import LlmAgent
 from google.adk.apps import App
 from google.adk.tools import ToolContext
 
-from .plugin import CountInvocationPlugin
+from .plugin import MetricsPlugin
+from .profiling import ProfilingPlugin
 
 
 async def hello_world(tool_context: ToolContext, query: str) -> None:
@@ -17,4 +20,9 @@ root_agent = LlmAgent(
     tools=[hello_world],
 )
 
-app = App(name="count_plugin", root_agent=root_agent, plugins=[CountInvocationPlugin()])
+plugins = [MetricsPlugin()]
+# Profiling writes a .folded file per invocation, so it is opt-in.
+if profile_dir := os.environ.get("ADK_PROFILE_DIR"):
+    plugins.append(ProfilingPlugin(profile_dir))
+
+app = App(name="count_plugin", root_agent=root_agent, plugins=plugins)
@@ -0,0 +1,77 @@
+"""Callback overhead of CountInvocationPlugin vs MetricsPlugin.
+
+Drives one agent -> model -> tool cycle of callbacks per iteration with fake
+contexts, so only the plugin's own work is measured. Output goes to a
+line-buffered /dev/null, which is how stdout behaves on a terminal: one write
+syscall per print. A real terminal or log pipe is slower still.
+
+    python -m count_plugin.benchmark  # from the adk directory
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from types import SimpleNamespace
+
+from .plugin import CountInvocationPlugin, MetricsPlugin
+
+ITERATIONS = 100_000
+SESSIONS = 100
+
+
+async def run_cycle(plugin, agent, tool, context) -> None:
+    await plugin.before_agent_callback(agent=agent, callback_context=context)
+    await plugin.before_model_callback(callback_context=context, llm_request=None)
+    await plugin.after_model_callback(callback_context=context, llm_response=None)
+    await plugin.before_tool_callback(tool=tool, tool_args={}, tool_context=context)
+    await plugin.after_tool_callback(
+        tool=tool, tool_args={}, tool_context=context, result={}
+    )
+    await plugin.after_agent_callback(agent=agent, callback_context=context)
+
+
+async def bench(plugin) -> float:
+    agent = SimpleNamespace(name="hello_world")
+    tool = SimpleNamespace(name="hello_world")
+    contexts = [
+        SimpleNamespace(
+            session=SimpleNamespace(id=f"session_{i}"),
+            invocation_id=f"invocation_{i}",
+            agent_name="hello_world",
+            function_call_id=f"call_{i}",
+        )
+        for i in range(SESSIONS)
+    ]
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        await run_cycle(plugin, agent, tool, contexts[i % SESSIONS])
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+async def main() -> None:
+    for name, plugin in [
+        ("no-op", BaseLine()),
+        ("CountInvocationPlugin", CountInvocationPlugin()),
+        ("MetricsPlugin", MetricsPlugin()),
+    ]:
+        with open(os.devnull, "w", buffering=1) as devnull, contextlib.redirect_stdout(
+            devnull
+        ):
+            per_cycle = await bench(plugin)
+        print(f"{name:>22}: {per_cycle * 1e6:6.2f} us per agent/model/tool cycle")
+
+
+class BaseLine(CountInvocationPlugin):
+    async def before_agent_callback(self, **kwargs):
+        pass
+
+    async def before_model_callback(self, **kwargs):
+        pass
+
+    async def before_tool_callback(self, **kwargs):
+        pass
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+import math
+from collections import Counter
+
+# Log-linear buckets as in HdrHistogram: values are kept in microseconds with
+# 5 significant bits, so every bucket is within ~3% of the values it holds.
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT // 2
+MAX_MICROSECONDS = 60 * 60 * 1_000_000
+
+
+def _bucket_index(microseconds: int) -> int:
+    if microseconds < SUB_BUCKET_COUNT:
+        return microseconds
+    shift = microseconds.bit_length() - SUB_BUCKET_BITS
+    return shift * HALF_SUB_BUCKET_COUNT + (microseconds >> shift)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // HALF_SUB_BUCKET_COUNT - 1
+    return ((index - shift * HALF_SUB_BUCKET_COUNT + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Latency distribution in a fixed number of buckets (up to one hour).
+
+    Recording is O(1) and memory does not grow with the number of samples.
+    Values above the range are counted in the last bucket.
+    """
+
+    BUCKET_COUNT = _bucket_index(MAX_MICROSECONDS) + 1
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        microseconds = min(int(seconds * 1_000_000), MAX_MICROSECONDS)
+        self.counts[_bucket_index(max(microseconds, 0))] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Return the upper bound in seconds of the bucket holding `percent`."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * percent / 100), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(_bucket_upper_bound(index) / 1_000_000, self.max)
+        return self.max
+
+
+def render_text(
+    session_counts: dict[str, Counter],
+    tool_calls: Counter,
+    tool_errors: Counter,
+    latencies: dict[tuple[str, str], LatencyHistogram],
+) -> str:
+    lines = []
+    for session_id, counts in session_counts.items():
+        summary = " ".join(f"{kind}={count}" for kind, count in sorted(counts.items()))
+        lines.append(f"[Metrics] session {session_id}: {summary}")
+    for tool_name, calls in sorted(tool_calls.items()):
+        lines.append(
+            f"[Metrics] tool {tool_name}: calls={calls} errors={tool_errors[tool_name]}"
+        )
+    for (kind, name), histogram in sorted(latencies.items()):
+        lines.append(
+            f"[Metrics] latency {kind} {name}: count={histogram.count}"
+            f" p50={histogram.percentile(50) * 1000:.3f}ms"
+            f" p90={histogram.percentile(90) * 1000:.3f}ms"
+            f" p99={histogram.percentile(99) * 1000:.3f}ms"
+            f" max={histogram.max * 1000:.3f}ms"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def render_prometheus(
+    session_counts: dict[str, Counter],
+    tool_calls: Counter,
+    tool_errors: Counter,
+    latencies: dict[tuple[str, str], LatencyHistogram],
+) -> str:
+    lines = ["# TYPE adk_callbacks_total counter"]
+    for session_id, counts in session_counts.items():
+        for kind, count in sorted(counts.items()):
+            lines.append(
+                f"adk_callbacks_total{_labels(session=session_id, kind=kind)} {count}"
+            )
+    lines.append("# TYPE adk_tool_calls_total counter")
+    for tool_name, calls in sorted(tool_calls.items()):
+        lines.append(f"adk_tool_calls_total{_labels(tool=tool_name)} {calls}")
+    lines.append("# TYPE adk_tool_errors_total counter")
+    for tool_name in sorted(tool_calls):
+        lines.append(
+            f"adk_tool_errors_total{_labels(tool=tool_name)} {tool_errors[tool_name]}"
+        )
+    lines.append("# TYPE adk_callback_latency_seconds summary")
+    for (kind, name), histogram in sorted(latencies.items()):
+        for quantile in ("0.5", "0.9", "0.99"):
+            labels = _labels(kind=kind, name=name, quantile=quantile)
+            value = histogram.percentile(float(quantile) * 100)
+            lines.append(f"adk_callback_latency_seconds{labels} {value}")
+        labels = _labels(kind=kind, name=name)
+        lines.append(f"adk_callback_latency_seconds_sum{labels} {histogram.sum}")
+        lines.append(f"adk_callback_latency_seconds_count{labels} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,6 +1,16 @@
 # https://github.com/google/adk-python/tree/v1.16.0/contributing/samples/plugin_basic
+import asyncio
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Literal
+
 from google.adk.plugins import BasePlugin
 
+from .metrics import LatencyHistogram, render_prometheus, render_text
+
 
 class CountInvocationPlugin(BasePlugin):
     def __init__(self):
@@ -20,3 +30,133 @@ class CountInvocationPlugin(BasePlugin):
     async def before_tool_callback(self, *, tool, tool_args, tool_context):
         self.tool_count += 1
         print(f"[Plugin] Tool call count: {self.tool_count}")
+
+
+class MetricsPlugin(BasePlugin):
+    """Counts agent, model and tool calls and times them, without I/O in callbacks.
+
+    Counters are kept per session (for the `max_sessions` most recent ones) and
+    per tool, and the time between each before/after callback pair goes into a
+    LatencyHistogram. A background task writes a report every `flush_interval`
+    seconds to stdout, or to `output`: appended as text, or replaced as a
+    Prometheus text-format file (e.g. for node_exporter's textfile collector).
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 60.0,
+        output: str | os.PathLike | None = None,
+        format: Literal["text", "prometheus"] = "text",
+        max_sessions: int = 1024,
+    ):
+        super().__init__(name="metrics")
+        self.flush_interval = flush_interval
+        self.output = Path(output) if output is not None else None
+        self.format = format
+        self.max_sessions = max_sessions
+        self.session_counts: OrderedDict[str, Counter] = OrderedDict()
+        self.tool_calls: Counter = Counter()
+        self.tool_errors: Counter = Counter()
+        self.latencies: dict[tuple[str, str], LatencyHistogram] = {}
+        self._started: dict[tuple, float] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def before_run_callback(self, *, invocation_context):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def after_run_callback(self, *, invocation_context):
+        # Drop the start times of calls that raised before their after callback.
+        invocation_id = invocation_context.invocation_id
+        for key in [key for key in self._started if key[1] == invocation_id]:
+            del self._started[key]
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._count(callback_context.session.id, "agent")
+        self._started["agent", callback_context.invocation_id, agent.name] = (
+            time.perf_counter()
+        )
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._stop(("agent", callback_context.invocation_id, agent.name), agent.name)
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self._count(callback_context.session.id, "model")
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        self._started[key] = time.perf_counter()
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        # Streaming calls this once per chunk; only the first one is timed.
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        self._stop(key, callback_context.agent_name)
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        self._stop(key, callback_context.agent_name)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._count(tool_context.session.id, "tool")
+        self.tool_calls[tool.name] += 1
+        key = ("tool", tool_context.invocation_id, tool_context.function_call_id)
+        self._started[key] = time.perf_counter()
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        key = ("tool", tool_context.invocation_id, tool_context.function_call_id)
+        self._stop(key, tool.name)
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self.tool_errors[tool.name] += 1
+        key = ("tool", tool_context.invocation_id, tool_context.function_call_id)
+        self._stop(key, tool.name)
+
+    def render(self) -> str:
+        render = render_prometheus if self.format == "prometheus" else render_text
+        return render(
+            self.session_counts, self.tool_calls, self.tool_errors, self.latencies
+        )
+
+    async def flush(self) -> None:
+        await asyncio.to_thread(self._write, self.render())
+
+    async def close(self) -> None:
+        """Stop the background task and write a final report."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    def _count(self, session_id: str, kind: str) -> None:
+        counts = self.session_counts.get(session_id)
+        if counts is None:
+            counts = self.session_counts[session_id] = Counter()
+            if len(self.session_counts) > self.max_sessions:
+                self.session_counts.popitem(last=False)
+        else:
+            self.session_counts.move_to_end(session_id)
+        counts[kind] += 1
+
+    def _stop(self, key: tuple, name: str) -> None:
+        started = self._started.pop(key, None)
+        if started is None:
+            return
+        histogram = self.latencies.get((key[0], name))
+        if histogram is None:
+            histogram = self.latencies[key[0], name] = LatencyHistogram()
+        histogram.record(time.perf_counter() - started)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _write(self, report: str) -> None:
+        if self.output is None:
+            sys.stdout.write(report)
+            sys.stdout.flush()
+        elif self.format == "prometheus":
+            tmp_path = self.output.with_suffix(".tmp")
+            tmp_path.write_text(report)
+            tmp_path.replace(self.output)
+        else:
+            with self.output.open("a") as f:
+                f.write(report)
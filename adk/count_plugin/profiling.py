@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from google.adk.plugins import BasePlugin
+
+from .metrics import LatencyHistogram
+
+
+@dataclass
+class CallStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    request_bytes: int = 0
+    response_bytes: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class _Frame:
+    path: str
+    stats_key: tuple[str, str]
+    started: float
+    parent: "_Frame | None"
+    child_seconds: float = 0.0
+
+
+class ProfilingPlugin(BasePlugin):
+    """Times every agent, model and tool call and measures its payloads.
+
+    `stats` holds a CallStats per ("agent", agent name), ("model", model name)
+    and ("tool", tool name): wall time, serialized request/response bytes
+    (UTF-8) and, for models, token counts. After each invocation the self time
+    of every frame is written to
+    `<output_dir>/<invocation_id>.folded` in the folded-stack format read by
+    flamegraph.pl and speedscope, with one sample per microsecond, e.g.
+
+        agent:root;agent:researcher;tool:search 183000
+    """
+
+    def __init__(self, output_dir: str | os.PathLike = "profiles"):
+        super().__init__(name="profiling")
+        self.output_dir = Path(output_dir)
+        self.stats: dict[tuple[str, str], CallStats] = {}
+        self._frames: dict[tuple, _Frame] = {}
+        self._model_calls: dict[tuple, tuple[str, str]] = {}
+        self._folded: dict[str, dict[str, int]] = {}
+
+    async def after_run_callback(self, *, invocation_context):
+        invocation_id = invocation_context.invocation_id
+        for key in [key for key in self._frames if key[0] == invocation_id]:
+            del self._frames[key]
+        for key in [key for key in self._model_calls if key[0] == invocation_id]:
+            del self._model_calls[key]
+        folded = self._folded.pop(invocation_id, None)
+        if folded:
+            await asyncio.to_thread(self._write, invocation_id, folded)
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        invocation_id = callback_context.invocation_id
+        parent = None
+        if agent.parent_agent is not None:
+            parent = self._frames.get((invocation_id, "agent", agent.parent_agent.name))
+        self._open(
+            (invocation_id, "agent", agent.name),
+            f"agent:{agent.name}",
+            ("agent", agent.name),
+            parent,
+        )
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._close((callback_context.invocation_id, "agent", agent.name))
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        model = llm_request.model or "unknown"
+        key = (invocation_id, "model", agent_name)
+        frame = self._open(
+            key,
+            f"model:{model}",
+            ("model", model),
+            self._frames.get((invocation_id, "agent", agent_name)),
+        )
+        self._model_calls[key] = frame.stats_key
+        self._stats(frame.stats_key).request_bytes += len(
+            llm_request.model_dump_json(
+                include={"contents", "config"}, exclude_none=True
+            ).encode()
+        )
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        # Streaming calls this once per partial chunk and once more with the
+        # aggregated response: the first chunk closes the frame, and only the
+        # final response is measured so the chunks are not counted twice.
+        key = (callback_context.invocation_id, "model", callback_context.agent_name)
+        self._close(key)
+        stats_key = self._model_calls.get(key)
+        if stats_key is None or llm_response.partial:
+            return
+        stats = self._stats(stats_key)
+        stats.response_bytes += len(
+            llm_response.model_dump_json(exclude_none=True).encode()
+        )
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            stats.input_tokens += usage.prompt_token_count or 0
+            stats.output_tokens += usage.candidates_token_count or 0
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._close(
+            (callback_context.invocation_id, "model", callback_context.agent_name)
+        )
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        invocation_id = tool_context.invocation_id
+        frame = self._open(
+            (invocation_id, "tool", tool_context.function_call_id),
+            f"tool:{tool.name}",
+            ("tool", tool.name),
+            self._frames.get((invocation_id, "agent", tool_context.agent_name)),
+        )
+        self._stats(frame.stats_key).request_bytes += _json_bytes(tool_args)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._close((tool_context.invocation_id, "tool", tool_context.function_call_id))
+        self._stats(("tool", tool.name)).response_bytes += _json_bytes(result)
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._close((tool_context.invocation_id, "tool", tool_context.function_call_id))
+
+    def report(self) -> str:
+        lines = [
+            f"{'':<40} {'calls':>7} {'total s':>9} {'p50 ms':>9} {'p99 ms':>9}"
+            f" {'req bytes':>11} {'resp bytes':>11} {'in tok':>8} {'out tok':>8}"
+        ]
+        for (kind, name), stats in sorted(self.stats.items()):
+            latency = stats.latency
+            lines.append(
+                f"{kind + ':' + name:<40} {latency.count:>7} {latency.sum:>9.3f}"
+                f" {latency.percentile(50) * 1000:>9.1f}"
+                f" {latency.percentile(99) * 1000:>9.1f}"
+                f" {stats.request_bytes:>11} {stats.response_bytes:>11}"
+                f" {stats.input_tokens:>8} {stats.output_tokens:>8}"
+            )
+        return "\n".join(lines)
+
+    def _open(
+        self,
+        key: tuple,
+        label: str,
+        stats_key: tuple[str, str],
+        parent: _Frame | None,
+    ) -> _Frame:
+        label = label.replace(";", "_").replace(" ", "_")
+        path = f"{parent.path};{label}" if parent is not None else label
+        frame = _Frame(path, stats_key, time.perf_counter(), parent)
+        self._frames[key] = frame
+        return frame
+
+    def _close(self, key: tuple) -> _Frame | None:
+        frame = self._frames.pop(key, None)
+        if frame is None:
+            return None
+        elapsed = time.perf_counter() - frame.started
+        if frame.parent is not None:
+            frame.parent.child_seconds += elapsed
+        self._stats(frame.stats_key).latency.record(elapsed)
+        # Concurrent children (parallel tools or sub-agents) can add up to more
+        # than the parent's wall time.
+        self_microseconds = int(max(elapsed - frame.child_seconds, 0.0) * 1_000_000)
+        folded = self._folded.setdefault(key[0], {})
+        folded[frame.path] = folded.get(frame.path, 0) + self_microseconds
+        return frame
+
+    def _stats(self, key: tuple[str, str]) -> CallStats:
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = CallStats()
+        return stats
+
+    def _write(self, invocation_id: str, folded: dict[str, int]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        lines = [f"{path} {samples}\n" for path, samples in folded.items() if samples]
+        (self.output_dir / f"{invocation_id}.folded").write_text("".join(lines))
+
+
+def _json_bytes(value) -> int:
+    return len(json.dumps(value, default=str, ensure_ascii=False).encode())
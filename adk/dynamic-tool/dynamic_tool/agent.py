@@ -1,63 +1,42 @@
+import warnings
+from collections.abc import Callable
+
 from google.adk.agents.llm_agent import Agent
 from google.adk.agents.readonly_context import ReadonlyContext
-from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.base_toolset import BaseToolset
-from google.adk.tools.function_tool import FunctionTool
-
-ALLOWED_MODES = ("lower", "reverse", "title", "upper")
-
-
-def upper_text(text: str) -> dict:
-  """Convert text to uppercase.
 
-  Args:
-    text: Text to transform.
-
-  Returns:
-    A dictionary containing the selected mode and transformed text.
-  """
-  return {"status": "ok", "mode": "upper", "input": text, "output": text.upper()}
-
-
-def lower_text(text: str) -> dict:
-  """Convert text to lowercase.
-
-  Args:
-    text: Text to transform.
-
-  Returns:
-    A dictionary containing the selected mode and transformed text.
-  """
-  return {"status": "ok", "mode": "lower", "input": text, "output": text.lower()}
-
-
-def reverse_text(text: str) -> dict:
-  """Reverse text.
-
-  Args:
-    text: Text to transform.
+from .registry import (
+    CachedDeclarationTool,
+    ModeRegistry,
+    ToolList,
+    normalize_mode,
+)
 
-  Returns:
-    A dictionary containing the selected mode and transformed text.
-  """
-  return {
-      "status": "ok",
-      "mode": "reverse",
-      "input": text,
-      "output": text[::-1],
-  }
+MODES = ModeRegistry.default()
 
+_MOVED_TRANSFORMS = ("lower_text", "reverse_text", "title_text", "upper_text")
 
-def title_text(text: str) -> dict:
-  """Convert text to title case.
 
-  Args:
-    text: Text to transform.
+def __getattr__(name: str):
+  # Keep the names this module had before the registry, without importing the
+  # transforms at startup.
+  if name == "ALLOWED_MODES":
+    warnings.warn(
+        "ALLOWED_MODES is deprecated; use MODES.names().",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return tuple(MODES.names())
+  if name in _MOVED_TRANSFORMS:
+    warnings.warn(
+        f"{name} moved to dynamic_tool.transforms.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    from . import transforms
 
-  Returns:
-    A dictionary containing the selected mode and transformed text.
-  """
-  return {"status": "ok", "mode": "title", "input": text, "output": text.title()}
+    return getattr(transforms, name)
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def missing_tool_mode(text: str) -> dict:
@@ -76,36 +55,39 @@ def missing_tool_mode(text: str) -> dict:
           "Missing temp:tool_mode. Provide it through the /run request's "
           "stateDelta field."
       ),
-      "allowed_modes": list(ALLOWED_MODES),
+      "allowed_modes": MODES.names(),
   }
 
 
 class DynamicTransformToolset(BaseToolset):
   """Expose one transform tool based on stateDelta-backed session state."""
 
-  def __init__(self):
+  def __init__(self, registry: ModeRegistry | None = None):
     super().__init__()
-    self._tools_by_mode = {
-        "upper": FunctionTool(upper_text),
-        "lower": FunctionTool(lower_text),
-        "reverse": FunctionTool(reverse_text),
-        "title": FunctionTool(title_text),
-    }
-    self._missing_mode_tool = FunctionTool(missing_tool_mode)
+    self._registry = registry if registry is not None else MODES
+    self._missing_mode_tools = ToolList(
+        [CachedDeclarationTool(missing_tool_mode)]
+    )
+
+  def register_mode(self, mode: str, func: Callable) -> None:
+    """Expose `func` as the only tool when temp:tool_mode is `mode`."""
+    self._registry.declare(mode, func)
 
   async def get_tools(
       self, readonly_context: ReadonlyContext | None = None
-  ) -> list[BaseTool]:
+  ) -> ToolList:
+    """Return the mode's ToolList, a tuple shared by every turn."""
     mode = None
     if readonly_context:
       mode = readonly_context.state.get("temp:tool_mode")
-    if mode is not None:
-      mode = str(mode).lower().strip()
 
-    tool = self._tools_by_mode.get(mode)
-    if tool:
-      return [tool]
-    return [self._missing_mode_tool]
+    # Modes normally arrive already normalized; only normalize on a miss.
+    tools = self._registry.get(mode) if isinstance(mode, str) else None
+    if tools is None and mode is not None and normalize_mode(mode) != mode:
+      tools = self._registry.get(normalize_mode(mode))
+    if tools is not None:
+      return tools
+    return self._missing_mode_tools
 
 
 root_agent = Agent(
@@ -115,8 +97,11 @@ root_agent = Agent(
     instruction=(
         "Use the available tool to transform the user's text. "
         "The API caller controls which transform tool is available by setting "
-        "stateDelta.temp:tool_mode to one of upper, lower, reverse, or title. "
+        "stateDelta.temp:tool_mode to a registered mode such as upper, lower, "
+        "reverse, or title. "
         "Do not infer the mode from the user's natural-language message. "
+        "Only when the bulk_transform tool is available, take the texts and "
+        "the chain of modes to apply from the user's message. "
         "If the available tool reports an error, explain it briefly."
     ),
     tools=[DynamicTransformToolset()],
@@ -0,0 +1,89 @@
+"""Per-turn cost of resolving the tools for a mode and adding them to a request.
+
+Registers hundreds of modes, then for every simulated model turn calls
+get_tools() and appends the tools to a fresh LlmRequest, the way the LLM flow
+does. The uncached baseline is the previous get_tools(): a new list per turn
+with plain FunctionTools that rebuild their declaration every time.
+
+    uv run python -m dynamic_tool.benchmark
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools.function_tool import FunctionTool
+
+from .agent import DynamicTransformToolset
+from .registry import ModeRegistry
+
+MODES = 500
+TURNS = 5_000
+
+
+def make_transform(index: int):
+  def transform(text: str, repeat: int = 1) -> dict:
+    """Apply a registered transform.
+
+    Args:
+      text: Text to transform.
+      repeat: How many times to apply the transform.
+
+    Returns:
+      A dictionary containing the selected mode and transformed text.
+    """
+    return {"status": "ok", "mode": f"mode_{index}", "output": text * repeat}
+
+  transform.__name__ = f"transform_{index}"
+  return transform
+
+
+class UncachedToolset:
+
+  def __init__(self, funcs):
+    self._tools_by_mode = {
+        mode: FunctionTool(func) for mode, func in funcs.items()
+    }
+
+  async def get_tools(self, readonly_context=None):
+    mode = readonly_context.state.get("temp:tool_mode")
+    if mode is not None:
+      mode = str(mode).lower().strip()
+    return [self._tools_by_mode[mode]]
+
+
+async def bench(toolset, contexts, append: bool) -> float:
+  start = time.perf_counter()
+  for turn in range(TURNS):
+    tools = await toolset.get_tools(contexts[turn % len(contexts)])
+    if append:
+      LlmRequest().append_tools(list(tools))
+  return (time.perf_counter() - start) / TURNS
+
+
+async def main() -> None:
+  funcs = {f"mode_{i}": make_transform(i) for i in range(MODES)}
+  toolset = DynamicTransformToolset(ModeRegistry())
+  for mode, func in funcs.items():
+    toolset.register_mode(mode, func)
+  contexts = [
+      SimpleNamespace(state={"temp:tool_mode": mode}) for mode in funcs
+  ]
+  uncached_toolset = UncachedToolset(funcs)
+
+  print(f"{MODES} modes, {TURNS} turns")
+  for append in (False, True):
+    label = "get_tools + append_tools" if append else "get_tools"
+    uncached = await bench(uncached_toolset, contexts, append)
+    # Build every declaration once, as the first turn per mode does.
+    await bench(toolset, contexts, append)
+    cached = await bench(toolset, contexts, append)
+    print(
+        f"{label:>24}: uncached {uncached * 1e6:7.1f} us,"
+        f" cached {cached * 1e6:7.1f} us per turn"
+    )
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
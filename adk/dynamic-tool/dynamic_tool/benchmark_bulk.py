@@ -0,0 +1,62 @@
+"""Throughput of bulk_transform vs one single-mode tool call per text and mode.
+
+Applies the chain ["lower", "reverse", "upper"] to 8 MiB of text, split into
+one text or many, and serializes every tool response to JSON as it would be
+sent back to the model.
+
+    uv run python -m dynamic_tool.benchmark_bulk
+"""
+
+import asyncio
+import json
+import time
+
+from .bulk import bulk_transform
+from .transforms import lower_text, reverse_text, upper_text
+
+TOTAL_BYTES = 8 * 1024 * 1024
+CHAIN = [lower_text, reverse_text, upper_text]
+MODES = ["lower", "reverse", "upper"]
+
+
+def per_text_calls(texts: list[str]) -> int:
+  response_bytes = 0
+  for text in texts:
+    for transform in CHAIN:
+      response = transform(text)
+      response_bytes += len(json.dumps(response, ensure_ascii=False))
+      text = response["output"]
+  return response_bytes
+
+
+async def bulk_call(texts: list[str]) -> int:
+  response = await bulk_transform(texts, MODES, tool_context=None)
+  return len(json.dumps(response, ensure_ascii=False))
+
+
+async def main() -> None:
+  print(
+      f"{'texts':>6} {'per-text MiB/s':>15} {'bulk MiB/s':>11}"
+      f" {'per-text resp MiB':>18} {'bulk resp MiB':>14}"
+  )
+  for count in (1, 64, 2048):
+    texts = ["Hello ADK dynamic tool! " * (TOTAL_BYTES // 24 // count)] * count
+    mib = sum(map(len, texts)) / 1024 / 1024
+
+    start = time.perf_counter()
+    per_text_bytes = per_text_calls(texts)
+    per_text = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk_bytes = await bulk_call(texts)
+    bulk = time.perf_counter() - start
+
+    print(
+        f"{count:>6} {mib / per_text:>15.1f} {mib / bulk:>11.1f}"
+        f" {per_text_bytes / 1024 / 1024:>18.1f}"
+        f" {bulk_bytes / 1024 / 1024:>14.1f}"
+    )
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Startup time and memory of ModeRegistry as the number of modes grows.
+
+Generates N mode modules that each allocate a lookup table when imported,
+declares them through a manifest, and reports the cost of declaring them, then
+of selecting every mode once. Loaded modes are kept, so the memory after
+selecting every mode grows with the number of modes selected.
+
+    uv run python -m dynamic_tool.benchmark_registry
+"""
+
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from .registry import ModeRegistry
+
+MODE_SOURCE = '''TABLE = list(range(20_000))
+
+
+def transform_{index}(text: str) -> dict:
+  """Apply transform {index}.
+
+  Args:
+    text: Text to transform.
+
+  Returns:
+    A dictionary containing the transformed text.
+  """
+  return {{"status": "ok", "output": text[TABLE[{index}] % 7:]}}
+'''
+
+
+def write_modes(directory: Path, count: int) -> Path:
+  manifest = {}
+  for index in range(count):
+    module_name = f"bench_mode_{count}_{index}"
+    (directory / f"{module_name}.py").write_text(
+        MODE_SOURCE.format(index=index)
+    )
+    manifest[f"mode_{index}"] = f"{module_name}:transform_{index}"
+  path = directory / f"modes_{count}.json"
+  path.write_text(json.dumps(manifest))
+  return path
+
+
+def main() -> None:
+  with tempfile.TemporaryDirectory() as directory:
+    sys.path.insert(0, directory)
+    print(
+        f"{'modes':>6} {'declare ms':>11} {'declared KiB':>13}"
+        f" {'loaded':>7} {'after all selected KiB':>23}"
+    )
+    for count in (10, 100, 1000):
+      manifest = write_modes(Path(directory), count)
+
+      tracemalloc.start()
+      start = time.perf_counter()
+      registry = ModeRegistry()
+      registry.declare_manifest(manifest)
+      declare_ms = (time.perf_counter() - start) * 1000
+      declared, _ = tracemalloc.get_traced_memory()
+
+      for mode in registry.names():
+        registry.get(mode)
+      gc.collect()
+      selected, _ = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+
+      print(
+          f"{count:>6} {declare_ms:>11.2f} {declared / 1024:>13.1f}"
+          f" {len(registry.loaded()):>7} {selected / 1024:>23.1f}"
+      )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,121 @@
+import functools
+import inspect
+import json
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .registry import normalize_mode
+
+if TYPE_CHECKING:
+  from .registry import ModeRegistry
+
+ARTIFACT_FILENAME = "bulk_transform_outputs.json"
+
+
+async def bulk_transform(
+    texts: list[str],
+    modes: list[str],
+    tool_context: ToolContext,
+    save_as_artifact: bool = False,
+) -> dict:
+  """Apply a chain of transform modes to many texts in one call.
+
+  Args:
+    texts: Texts to transform. Each one is transformed on its own.
+    modes: Transform modes applied to every text in order, e.g. ["lower",
+      "reverse"].
+    save_as_artifact: Save the outputs as a JSON artifact and return a
+      reference to it instead of the outputs.
+
+  Returns:
+    A dictionary with the outputs in the order of `texts` (the inputs are not
+    echoed back), or the artifact filename and version.
+  """
+  # Imported here because the agent module imports the registry that loads
+  # this mode.
+  from .agent import MODES
+
+  return await _bulk_transform(
+      MODES, texts, modes, tool_context, save_as_artifact
+  )
+
+
+def _bind_registry(registry: "ModeRegistry") -> Callable:
+  """Return bulk_transform resolving modes through `registry`."""
+
+  @functools.wraps(bulk_transform)
+  async def bound(
+      texts: list[str],
+      modes: list[str],
+      tool_context: ToolContext,
+      save_as_artifact: bool = False,
+  ) -> dict:
+    return await _bulk_transform(
+        registry, texts, modes, tool_context, save_as_artifact
+    )
+
+  return bound
+
+
+bulk_transform.bind_registry = _bind_registry
+
+
+async def _bulk_transform(
+    registry: "ModeRegistry",
+    texts: list[str],
+    modes: list[str],
+    tool_context: ToolContext,
+    save_as_artifact: bool,
+) -> dict:
+  transforms = []
+  for mode in modes:
+    tools = registry.get(normalize_mode(mode))
+    func = tools[0].func if tools is not None else None
+    if func is None or getattr(func, "__wrapped__", func) is bulk_transform:
+      return {
+          "status": "error",
+          "message": f"Unknown transform mode {mode!r}.",
+          "allowed_modes": [
+              name for name in registry.names() if name != "bulk"
+          ],
+      }
+    transforms.append(func)
+
+  outputs = []
+  for index, text in enumerate(texts):
+    for mode, transform in zip(modes, transforms):
+      result = transform(text)
+      if inspect.isawaitable(result):
+        result = await result
+      if not isinstance(result, dict) or "output" not in result:
+        return {
+            "status": "error",
+            "message": f"Mode {mode!r} returned no output for texts[{index}].",
+            "mode": mode,
+            "index": index,
+            "result": result if isinstance(result, dict) else repr(result),
+        }
+      text = result["output"]
+    outputs.append(text)
+
+  if not save_as_artifact:
+    return {"status": "ok", "modes": modes, "outputs": outputs}
+  data = json.dumps(outputs, ensure_ascii=False).encode()
+  try:
+    version = await tool_context.save_artifact(
+        ARTIFACT_FILENAME,
+        types.Part.from_bytes(data=data, mime_type="application/json"),
+    )
+  except ValueError as e:
+    return {"status": "error", "message": str(e)}
+  return {
+      "status": "ok",
+      "modes": modes,
+      "artifact": ARTIFACT_FILENAME,
+      "version": version,
+      "count": len(outputs),
+      "bytes": len(data),
+  }
@@ -0,0 +1,143 @@
+import importlib
+import itertools
+import json
+import logging
+import os
+from collections.abc import Callable
+from importlib.metadata import entry_points
+from pathlib import Path
+
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+
+ENTRY_POINT_GROUP = "dynamic_tool.modes"
+MANIFEST_PATH = Path(__file__).with_name("modes.json")
+
+_versions = itertools.count(1)
+
+logger = logging.getLogger(__name__)
+
+
+class CachedDeclarationTool(FunctionTool):
+  """FunctionTool that builds its function declaration only once.
+
+  FunctionTool introspects the function signature and docstring every time the
+  tool is added to an LLM request. The declaration only depends on the function
+  and the API variant, so it is cached per variant. Treat it as read-only.
+  """
+
+  def __init__(self, func: Callable):
+    super().__init__(func)
+    self._declarations: dict = {}
+
+  def _get_declaration(self) -> types.FunctionDeclaration | None:
+    variant = self._api_variant
+    if variant not in self._declarations:
+      self._declarations[variant] = super()._get_declaration()
+    return self._declarations[variant]
+
+
+class ToolList(tuple):
+  """The immutable tools for one mode, built once and returned on every turn.
+
+  `version` is unique to this list, so a caller that serialized `declarations`
+  before can skip re-serializing them while the version is unchanged.
+  """
+
+  def __new__(cls, tools: list[CachedDeclarationTool]):
+    tool_list = super().__new__(cls, tools)
+    tool_list.version = next(_versions)
+    return tool_list
+
+  @property
+  def declarations(self) -> tuple[types.FunctionDeclaration, ...]:
+    return tuple(tool._get_declaration() for tool in self)
+
+
+class ModeRegistry:
+  """Transform modes that are declared up front and imported on first use.
+
+  A mode is declared as a "module:function" target (from a JSON manifest or the
+  `dynamic_tool.modes` entry point group) or as a function. Declaring a target
+  does not import it, so startup cost and memory do not grow with the number of
+  declared modes. A mode's module and tools are kept once it is loaded, so
+  memory grows with the number of modes used. A target that fails to
+  import is logged and treated as an unknown mode. A target with a
+  `bind_registry(registry)` attribute is replaced by what that returns, so a
+  tool that runs other modes (like bulk_transform) uses this registry.
+  """
+
+  def __init__(self):
+    self._targets: dict[str, str | Callable] = {}
+    self._loaded: dict[str, ToolList] = {}
+
+  @classmethod
+  def default(cls) -> "ModeRegistry":
+    """Return a registry with the built-in manifest and installed entry points."""
+    registry = cls()
+    registry.declare_manifest(MANIFEST_PATH)
+    registry.declare_entry_points()
+    return registry
+
+  def declare(self, mode: str, target: str | Callable) -> None:
+    """Declare `mode`, replacing (and unloading) any previous declaration."""
+    mode = normalize_mode(mode)
+    self._loaded.pop(mode, None)
+    self._targets[mode] = target
+
+  def declare_manifest(self, path: str | os.PathLike) -> None:
+    """Declare every mode in a JSON object of mode -> "module:function"."""
+    for mode, target in json.loads(Path(path).read_text()).items():
+      self.declare(mode, target)
+
+  def declare_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+    for entry_point in entry_points(group=group):
+      self.declare(entry_point.name, entry_point.value)
+
+  def names(self) -> list[str]:
+    return sorted(self._targets)
+
+  def loaded(self) -> list[str]:
+    return list(self._loaded)
+
+  def __contains__(self, mode: str) -> bool:
+    return mode in self._targets
+
+  def __len__(self) -> int:
+    return len(self._targets)
+
+  def get(self, mode: str) -> ToolList | None:
+    """Return the tools for a normalized mode, loading it if needed.
+
+    Returns None if the mode is not declared or its target cannot be loaded.
+    """
+    tools = self._loaded.get(mode)
+    if tools is not None:
+      return tools
+    target = self._targets.get(mode)
+    if target is None:
+      return None
+    func = _resolve(mode, target)
+    if func is None:
+      return None
+    bind_registry = getattr(func, "bind_registry", None)
+    if bind_registry is not None:
+      func = bind_registry(self)
+    tools = ToolList([CachedDeclarationTool(func)])
+    self._loaded[mode] = tools
+    return tools
+
+
+def _resolve(mode: str, target: str | Callable) -> Callable | None:
+  if callable(target):
+    return target
+  module_name, _, attribute = target.partition(":")
+  try:
+    return getattr(importlib.import_module(module_name), attribute)
+  except Exception:  # A broken manifest entry must not break every turn.
+    logger.exception("Cannot load mode %r from %r.", mode, target)
+    return None
+
+
+def normalize_mode(mode) -> str:
+  return str(mode).lower().strip()
@@ -0,0 +1,51 @@
+def upper_text(text: str) -> dict:
+  """Convert text to uppercase.
+
+  Args:
+    text: Text to transform.
+
+  Returns:
+    A dictionary containing the selected mode and transformed text.
+  """
+  return {"status": "ok", "mode": "upper", "input": text, "output": text.upper()}
+
+
+def lower_text(text: str) -> dict:
+  """Convert text to lowercase.
+
+  Args:
+    text: Text to transform.
+
+  Returns:
+    A dictionary containing the selected mode and transformed text.
+  """
+  return {"status": "ok", "mode": "lower", "input": text, "output": text.lower()}
+
+
+def reverse_text(text: str) -> dict:
+  """Reverse text.
+
+  Args:
+    text: Text to transform.
+
+  Returns:
+    A dictionary containing the selected mode and transformed text.
+  """
+  return {
+      "status": "ok",
+      "mode": "reverse",
+      "input": text,
+      "output": text[::-1],
+  }
+
+
+def title_text(text: str) -> dict:
+  """Convert text to title case.
+
+  Args:
+    text: Text to transform.
+
+  Returns:
+    A dictionary containing the selected mode and transformed text.
+  """
+  return {"status": "ok", "mode": "title", "input": text, "output": text.title()}
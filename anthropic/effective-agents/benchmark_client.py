@@ -0,0 +1,129 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "anthropic",
+# ]
+# ///
+
+"""Per-call latency of llm_call with a new client per call and a shared one.
+
+Serves canned Messages API responses from a local HTTP server, so only the
+client side is measured: building the client, opening the connection, and
+the request itself. The server is plain HTTP on localhost, so the TLS
+handshake and network round trips a new connection costs against the real
+API are not included; the savings there are larger.
+
+    uv run benchmark_client.py
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from anthropic import Anthropic, AsyncAnthropic
+
+import orchestrator_workers_pattern as owp
+
+CALLS = 200
+
+RESPONSE = json.dumps(
+    {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": owp.WORKER_MODEL,
+        "content": [{"type": "text", "text": "<response>stub</response>"}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def previous_llm_call(prompt: str, model: str) -> str:
+    client = Anthropic()
+    response = client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.1,
+    )
+    return response.content[0].text
+
+
+async def previous_allm_call(prompt: str, model: str) -> str:
+    # Closed here: an unclosed client would be closed after the event loop.
+    async with AsyncAnthropic() as client:
+        response = await client.messages.create(
+            model=model,
+            max_tokens=4096,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+        )
+    return response.content[0].text
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    print(
+        f"{name:>24}: median {statistics.median(timings) * 1000:6.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95)] * 1000:6.2f} ms"
+    )
+
+
+def bench_sync(call) -> list[float]:
+    call("warm up", owp.WORKER_MODEL)
+    timings = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        call(f"prompt {i}", owp.WORKER_MODEL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_async(call) -> list[float]:
+    await call("warm up", owp.WORKER_MODEL)
+    timings = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        await call(f"prompt {i}", owp.WORKER_MODEL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["ANTHROPIC_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+
+    print(f"{CALLS} sequential calls to a local stub server")
+    report("new client per call", bench_sync(previous_llm_call))
+    report("shared client", bench_sync(owp.llm_call))
+    report("new async client", asyncio.run(bench_async(previous_allm_call)))
+    report("shared async client", asyncio.run(bench_async(owp.allm_call)))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
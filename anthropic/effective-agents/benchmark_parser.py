@@ -0,0 +1,114 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "anthropic",
+# ]
+# ///
+
+"""Parsing orchestrator responses with large task lists.
+
+Compares the previous parser (extract_xml and the line-based parse_tasks on
+the whole response) with TaskStreamParser fed the response in small chunks,
+as it streams in, for tasks laid out one tag per line and all on one line.
+Reports the parse time, the tasks found, and how much of the response had
+arrived when the first task was ready for a worker.
+
+    uv run benchmark_parser.py
+"""
+
+import re
+import time
+
+from orchestrator_workers_pattern import TaskStreamParser
+
+CHUNK_SIZE = 16
+ROUNDS = 5
+
+
+def previous_extract_xml(text: str, tag: str) -> str:
+    match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def previous_parse_tasks(tasks_xml: str) -> list[dict]:
+    tasks = []
+    for line in tasks_xml.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("<task>"):
+            current_task = {}
+        elif line.startswith("<type>"):
+            current_task["type"] = line[6:-7].strip()
+        elif line.startswith("<description>"):
+            current_task["description"] = line[13:-14].strip()
+        elif line.startswith("</task>") and "description" in current_task:
+            current_task.setdefault("type", "default")
+            tasks.append(current_task)
+    return tasks
+
+
+def previous_parse(response: str) -> list[dict]:
+    previous_extract_xml(response, "analysis")
+    return previous_parse_tasks(previous_extract_xml(response, "tasks"))
+
+
+def task_xml(i: int, inline: bool) -> str:
+    description = f"Write version {i}, emphasizing aspect {i}."
+    if inline:
+        return (
+            f"<task><type>style-{i}</type>"
+            f"<description>{description}</description></task>"
+        )
+    return (
+        f"    <task>\n        <type>style-{i}</type>\n"
+        f"        <description>{description}</description>\n    </task>\n"
+    )
+
+
+def response(task_count: int, inline: bool) -> str:
+    analysis = "The task benefits from several styles. " * 20
+    tasks = "".join(task_xml(i, inline) for i in range(task_count))
+    separator = "" if inline else "\n"
+    return (
+        f"<analysis>\n{analysis}\n</analysis>\n\n<tasks>{separator}"
+        f"{tasks}</tasks>\n"
+    )
+
+
+def stream_parse(text: str) -> tuple[int, int]:
+    parser = TaskStreamParser()
+    first_task_at = None
+    for start in range(0, len(text), CHUNK_SIZE):
+        if parser.feed(text[start : start + CHUNK_SIZE]) and first_task_at is None:
+            first_task_at = start + CHUNK_SIZE
+    return len(parser.tasks), first_task_at
+
+
+def bench(parse, text: str):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = parse(text)
+    return (time.perf_counter() - start) / ROUNDS, result
+
+
+def main() -> None:
+    for task_count in (100, 1_000, 10_000):
+        for inline in (False, True):
+            text = response(task_count, inline)
+            layout = "one line" if inline else "one tag per line"
+            print(f"{task_count} tasks, {layout}, {len(text) / 1024:.0f} KiB")
+            elapsed, tasks = bench(previous_parse, text)
+            print(
+                f"  {'previous':>8}: {elapsed * 1000:7.2f} ms, "
+                f"{len(tasks):6d} tasks, first task after the whole response"
+            )
+            elapsed, (found, first_task_at) = bench(stream_parse, text)
+            print(
+                f"  {'stream':>8}: {elapsed * 1000:7.2f} ms, {found:6d} tasks, "
+                f"first task after {first_task_at / len(text):.1%} of the response"
+            )
+
+
+if __name__ == "__main__":
+    main()
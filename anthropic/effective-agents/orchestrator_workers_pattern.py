@@ -8,23 +8,379 @@
 # https://github.com/anthropics/claude-cookbooks/blob/3ddc4e0a0de45a0a255dd7bb54ecc0918cae7547/patterns/agents/util.py
 # https://github.com/anthropics/claude-cookbooks/blob/3ddc4e0a0de45a0a255dd7bb54ecc0918cae7547/patterns/agents/orchestrator_workers.ipynb
 
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
 import re
-from typing import TypedDict
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NotRequired, TypedDict
 
-from anthropic import Anthropic
+import httpx
+from anthropic import (
+    Anthropic,
+    APIError,
+    AsyncAnthropic,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+)
+
+ORCHESTRATOR_MODEL = "claude-sonnet-4-5-20250929"
+WORKER_MODEL = "claude-haiku-4-5-20251001"
+# Haiku 4.5 caches prompts of 4096 tokens or more; about 4 characters a token.
+WORKER_CACHE_MIN_CHARS = 4096 * 4
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    max_connections: int = 32
+    max_keepalive_connections: int = 32
+    # Seconds an idle connection is kept open for the next call.
+    keepalive_expiry: float = 60.0
+    # Retries of connection errors, 408, 409, 429 and 5xx responses, with the
+    # SDK's exponential backoff and jitter (honoring retry-after).
+    max_retries: int = 4
+    timeout: float = 600.0
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+_settings = ClientSettings()
+_client_lock = threading.Lock()
+_client: tuple[int, Anthropic] | None = None
+# httpx async connections belong to the event loop that opened them.
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAnthropic] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure_clients(**settings) -> None:
+    """Change ClientSettings fields and close the clients created with the
+    previous ones, so that later calls create new clients.
+
+    Call it while no requests are in flight, as those on the old clients may
+    fail. An async client is closed on its event loop if that loop is
+    running; otherwise it is dropped, and its connections close when it is
+    garbage collected.
+    """
+    global _settings, _client
+    with _client_lock:
+        _settings = ClientSettings(**{**_settings.__dict__, **settings})
+        client, _client = _client, None
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+    # A forked child must not close its parent's connections.
+    if client is not None and client[0] == os.getpid():
+        client[1].close()
+    for loop, async_client in async_clients:
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(async_client.close(), loop)
+
+
+def get_client() -> Anthropic:
+    """Return the process's Anthropic client, which keeps its connections
+    alive between calls."""
+    global _client
+    with _client_lock:
+        # A forked child must not share its parent's connections.
+        if _client is None or _client[0] != os.getpid():
+            client = Anthropic(
+                max_retries=_settings.max_retries,
+                timeout=_settings.timeout,
+                http_client=DefaultHttpxClient(limits=_settings.limits),
+            )
+            _client = (os.getpid(), client)
+        return _client[1]
+
+
+def get_async_client() -> AsyncAnthropic:
+    """Return the AsyncAnthropic client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncAnthropic(
+            max_retries=_settings.max_retries,
+            timeout=_settings.timeout,
+            http_client=DefaultAsyncHttpxClient(limits=_settings.limits),
+        )
+    return client
+
+
+class Usage(TypedDict, total=False):
+    input_tokens: int
+    output_tokens: int
+    # Prompt tokens written to and read from the prompt cache, not counted
+    # in input_tokens.
+    cache_creation_input_tokens: int
+    cache_read_input_tokens: int
+
+
+def _record_usage(usage: Usage | None, response) -> None:
+    if usage is None:
+        return
+    for key in Usage.__annotations__:
+        usage[key] = usage.get(key, 0) + (getattr(response.usage, key, 0) or 0)
+
+
+def cacheable(text: str) -> list[dict]:
+    """A system prompt whose text is cached for later requests with the same
+    prefix. Shorter prompts than the model's minimum (1024 tokens for Sonnet
+    4.5, 4096 for Haiku 4.5) are sent but not cached."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
 
 
-def llm_call(prompt: str, model: str, system_prompt: str = "") -> str:
-    client = Anthropic()
+class ResponseCache:
+    """SQLite cache of model replies, keyed by the whole request.
+
+    Entries older than `ttl` seconds are misses. Once the cached replies
+    take more than `max_bytes`, the least recently used ones are evicted.
+    `hits` and `misses` count this process's lookups. The database is in WAL
+    mode, so several processes can share it.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike = "llm_cache.sqlite3",
+        ttl: float | None = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+            " ON responses (accessed_at)"
+        )
+
+    @staticmethod
+    def key(model: str, system_prompt, messages: list[dict], **params) -> str:
+        request = {
+            "model": model,
+            "system": system_prompt,
+            "messages": messages,
+            "params": params,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def __contains__(self, key: str) -> bool:
+        """Whether `get(key)` would hit, without counting a lookup."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and (
+            self.ttl is None or time.time() - row[0] <= self.ttl
+        )
+
+    def put(self, key: str, text: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(text.encode()), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._db.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            )
+        (excess,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) - ? FROM responses", (self.max_bytes,)
+        ).fetchone()
+        if excess <= 0:
+            return
+        keys = []
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        for key, size in rows:
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_response_cache: ResponseCache | None = None
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Memoize llm_call, allm_call and allm_stream replies in `cache`, or
+    stop memoizing with None.
+
+    Replies are sampled with temperature 0.1, so a cached reply is one of
+    the replies the model could give, reused for every identical request.
+    Only complete replies are cached: one cut short by max_tokens is not.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def _cache_key(
+    model: str, system_prompt, messages: list[dict], max_tokens: int, use_cache: bool
+) -> tuple[ResponseCache | None, str]:
+    cache = _response_cache if use_cache else None
+    if cache is None:
+        return None, ""
+    return cache, cache.key(
+        model, system_prompt, messages, max_tokens=max_tokens, temperature=0.1
+    )
+
+
+def _is_cached(
+    prompt: str,
+    model: str,
+    system_prompt: str | list[dict] = "",
+    max_tokens: int = 4096,
+) -> bool:
+    """Whether the response cache has a reply for this llm_call request."""
+    messages = [{"role": "user", "content": prompt}]
+    cache, key = _cache_key(model, system_prompt, messages, max_tokens, True)
+    return cache is not None and key in cache
+
+
+def llm_call(
+    prompt: str,
+    model: str,
+    system_prompt: str | list[dict] = "",
+    usage: Usage | None = None,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+) -> str:
+    """Return the text of the model's reply, adding its token counts to
+    `usage` if given. With a response cache set (see set_response_cache),
+    a cached reply is returned without a request unless `use_cache` is
+    false."""
     messages = [{"role": "user", "content": prompt}]
+    cache, key = _cache_key(model, system_prompt, messages, max_tokens, use_cache)
+    if cache is not None and (text := cache.get(key)) is not None:
+        return text
+    client = get_client()
     response = client.messages.create(
         model=model,
-        max_tokens=4096,
+        max_tokens=max_tokens,
+        system=system_prompt,
+        messages=messages,
+        temperature=0.1,
+    )
+    _record_usage(usage, response)
+    text = response.content[0].text
+    if cache is not None and response.stop_reason == "end_turn":
+        cache.put(key, text)
+    return text
+
+
+async def allm_call(
+    prompt: str,
+    model: str,
+    system_prompt: str | list[dict] = "",
+    usage: Usage | None = None,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+) -> str:
+    messages = [{"role": "user", "content": prompt}]
+    cache, key = _cache_key(model, system_prompt, messages, max_tokens, use_cache)
+    if cache is not None and (text := cache.get(key)) is not None:
+        return text
+    client = get_async_client()
+    response = await client.messages.create(
+        model=model,
+        max_tokens=max_tokens,
         system=system_prompt,
         messages=messages,
         temperature=0.1,
     )
-    return response.content[0].text
+    _record_usage(usage, response)
+    text = response.content[0].text
+    if cache is not None and response.stop_reason == "end_turn":
+        cache.put(key, text)
+    return text
+
+
+async def allm_stream(
+    prompt: str,
+    model: str,
+    system_prompt: str | list[dict] = "",
+    usage: Usage | None = None,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """Like allm_call, but yield the reply's text as it is generated. A
+    cached reply is yielded at once."""
+    messages = [{"role": "user", "content": prompt}]
+    cache, key = _cache_key(model, system_prompt, messages, max_tokens, use_cache)
+    if cache is not None and (text := cache.get(key)) is not None:
+        yield text
+        return
+    client = get_async_client()
+    chunks = []
+    async with client.messages.stream(
+        model=model,
+        max_tokens=max_tokens,
+        system=system_prompt,
+        messages=messages,
+        temperature=0.1,
+    ) as stream:
+        async for text in stream.text_stream:
+            chunks.append(text)
+            yield text
+        message = await stream.get_final_message()
+    _record_usage(usage, message)
+    if cache is not None and message.stop_reason == "end_turn":
+        cache.put(key, "".join(chunks))
 
 
 def extract_xml(text: str, tag: str) -> str:
@@ -37,42 +393,124 @@ class TaskInfo(TypedDict):
     description: str
 
 
-def parse_tasks(tasks_xml: str) -> list[TaskInfo]:
-    tasks = []
+class TaskStreamParser:
+    """Incremental parser for the orchestrator's response.
 
-    for line in tasks_xml.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
+    Feed it the response as it is generated: each <task> is returned by the
+    feed call that receives its </task>, and the <analysis> text is kept in
+    `analysis`. Tags may be split across chunks and need not be on lines of
+    their own. The text of <analysis>, <type> and <description> is kept as
+    is, apart from surrounding whitespace. Each character is scanned about
+    once, and only the unfinished part of the response is kept.
+    """
+
+    FIELDS = ("analysis", "type", "description")
+    # A "<" with no ">" within this many characters is text, not a tag.
+    MAX_TAG_LENGTH = 64
+
+    def __init__(self):
+        self.analysis = ""
+        self.tasks: list[TaskInfo] = []
+        self._text = ""
+        self._pos = 0
+        self._task: dict | None = None
+        self._field: str | None = None
+        self._field_start = 0
+
+    def feed(self, chunk: str) -> list[TaskInfo]:
+        """Add `chunk` and return the tasks it completed."""
+        text = self._text + chunk
+        pos = self._pos
+        completed = []
+        while True:
+            if self._field is not None:
+                closing = f"</{self._field}>"
+                end = text.find(closing, pos)
+                if end == -1:
+                    pos = max(pos, len(text) - len(closing) + 1)
+                    break
+                value = text[self._field_start : end].strip()
+                if self._field == "analysis":
+                    self.analysis = value
+                elif self._task is not None:
+                    self._task[self._field] = value
+                self._field = None
+                pos = end + len(closing)
+                continue
 
-        if line.startswith("<task>"):
-            current_task = {}
-        elif line.startswith("<type>"):
-            current_task["type"] = line[6:-7].strip()
-        elif line.startswith("<description>"):
-            current_task["description"] = line[13:-14].strip()
-        elif line.startswith("</task>"):
-            if "description" in current_task:
-                if "type" not in current_task:
-                    current_task["type"] = "default"
-                tasks.append(current_task)
+            start = text.find("<", pos)
+            if start == -1:
+                pos = len(text)
+                break
+            end = text.find(">", start + 1, start + self.MAX_TAG_LENGTH)
+            if end == -1:
+                if len(text) - start < self.MAX_TAG_LENGTH:
+                    pos = start  # Wait for the rest of the tag.
+                    break
+                pos = start + 1
+                continue
+            name = text[start + 1 : end].split(maxsplit=1)
+            name = name[0] if name else ""
+            pos = end + 1
+            if name in self.FIELDS:
+                self._field = name
+                self._field_start = pos
+            elif name == "task":
+                self._task = {}
+            elif name == "/task" and self._task is not None:
+                if "description" in self._task:
+                    self._task.setdefault("type", "default")
+                    completed.append(self._task)
+                self._task = None
 
-    return tasks
+        keep = self._field_start if self._field is not None else pos
+        self._text = text[keep:]
+        self._pos = pos - keep
+        self._field_start -= keep
+        self.tasks.extend(completed)
+        return completed
+
+
+def parse_tasks(tasks_xml: str) -> list[TaskInfo]:
+    return TaskStreamParser().feed(tasks_xml)
 
 
 class ExecutedTask(TaskInfo):
     result: str
+    error: NotRequired[str]
+    usage: NotRequired[Usage]
 
 
 class Result(TypedDict):
     analysis: str
     tasks: list[ExecutedTask]
+    # Totals over all calls, including the orchestrator's.
+    usage: Usage
 
 
 class FlexibleOrchestrator:
-    def __init__(self, orchestrator_prompt: str, worker_prompt: str):
+    def __init__(
+        self,
+        orchestrator_prompt: str,
+        worker_prompt: str,
+        max_concurrency: int = 4,
+        worker_timeout: float | None = None,
+        worker_system_prompt: str | None = None,
+    ):
+        """`worker_system_prompt`, formatted like `worker_prompt` but without
+        the task type and description, is the part of the worker requests
+        that every worker shares. It is sent as a cacheable system prompt,
+        so workers after the first read it from the prompt cache. The model
+        only caches prompts of at least 4096 tokens (Haiku 4.5), so this
+        only pays off for long shared prompts, such as ones that include
+        reference documents through the context. The example
+        WORKER_SYSTEM_PROMPT is far shorter and is never cached."""
         self.orchestrator_prompt = orchestrator_prompt
         self.worker_prompt = worker_prompt
+        self.worker_system_prompt = worker_system_prompt
+        # Used by aprocess: workers running at once, and seconds per worker.
+        self.max_concurrency = max_concurrency
+        self.worker_timeout = worker_timeout
 
     @staticmethod
     def _format_prompt(template: str, **kwargs) -> str:
@@ -81,24 +519,17 @@ class FlexibleOrchestrator:
         except KeyError as e:
             raise ValueError(f"Missing required prompt variable: {e}")
 
-    def process(self, task: str, context: str | None = None) -> Result:
-        context = context or {}
-
+    def _orchestrator_input(self, task: str, context: dict) -> str:
         orchestrator_input = self._format_prompt(
             self.orchestrator_prompt, task=task, **context
         )
         print("=== ORCHESTRATOR INPUT ===")
         print(orchestrator_input)
         print()
+        return orchestrator_input
 
-        orchestrator_response = llm_call(
-            orchestrator_input, "claude-sonnet-4-5-20250929"
-        )
-
-        analysis = extract_xml(orchestrator_response, "analysis")
-        tasks_xml = extract_xml(orchestrator_response, "tasks")
-        tasks = parse_tasks(tasks_xml)
-
+    @staticmethod
+    def _print_orchestrator_output(analysis: str, tasks: list[TaskInfo]) -> None:
         print("=== ORCHESTRATOR OUTPUT ===")
         print()
         print("ANALYSIS:")
@@ -108,35 +539,540 @@ class FlexibleOrchestrator:
         print(tasks)
         print()
 
+    def _worker_system(self, task: str, context: dict) -> str | list[dict]:
+        if self.worker_system_prompt is None:
+            return ""
+        worker_system = self._format_prompt(
+            self.worker_system_prompt, original_task=task, **context
+        )
+        print("=== WORKER SYSTEM PROMPT ===")
+        print(worker_system)
+        print()
+        return cacheable(worker_system)
+
+    def _worker_input(self, task: str, task_info: TaskInfo, context: dict) -> str:
+        worker_input = self._format_prompt(
+            self.worker_prompt,
+            original_task=task,
+            task_type=task_info["type"],
+            task_description=task_info["description"],
+            **context,
+        )
+        print("=== WORKER INPUT ===")
+        print(worker_input)
+        print()
+        return worker_input
+
+    @staticmethod
+    def _worker_result(
+        task_info: TaskInfo, worker_response: str, usage: Usage
+    ) -> ExecutedTask:
+        result = extract_xml(worker_response, "response")
+        print(f"=== WORKER RESULT ({task_info['type']}) ===")
+        print(result)
+        if usage:
+            print(
+                f"(cache read {usage['cache_read_input_tokens']}, "
+                f"cache write {usage['cache_creation_input_tokens']}, "
+                f"uncached {usage['input_tokens']} input tokens)"
+            )
+        else:
+            print("(reply from the response cache)")
+        print()
+        return {
+            "type": task_info["type"],
+            "description": task_info["description"],
+            "result": result,
+            "usage": usage,
+        }
+
+    @staticmethod
+    def _worker_error(task_info: TaskInfo, error: str) -> ExecutedTask:
+        return {
+            "type": task_info["type"],
+            "description": task_info["description"],
+            "result": "",
+            "error": error,
+        }
+
+    @staticmethod
+    def _total_usage(usage: Usage, worker_results: list[ExecutedTask]) -> Usage:
+        total = dict(usage)
+        for executed in worker_results:
+            for key, value in executed.get("usage", {}).items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def process(self, task: str, context: dict | None = None) -> Result:
+        context = context or {}
+        usage: Usage = {}
+
+        orchestrator_input = self._orchestrator_input(task, context)
+        orchestrator_response = llm_call(
+            orchestrator_input, ORCHESTRATOR_MODEL, usage=usage
+        )
+        parser = TaskStreamParser()
+        parser.feed(orchestrator_response)
+        analysis, tasks = parser.analysis, parser.tasks
+        self._print_orchestrator_output(analysis, tasks)
+
+        worker_system = self._worker_system(task, context)
         worker_results = []
         for task_info in tasks:
-            worker_input = self._format_prompt(
-                self.worker_prompt,
-                original_task=task,
-                task_type=task_info["type"],
-                task_description=task_info["description"],
-                **context,
+            worker_input = self._worker_input(task, task_info, context)
+            worker_usage: Usage = {}
+            worker_response = llm_call(
+                worker_input, WORKER_MODEL, worker_system, worker_usage
+            )
+            worker_results.append(
+                self._worker_result(task_info, worker_response, worker_usage)
             )
-            print("=== WORKER INPUT ===")
-            print(worker_input)
-            print()
 
-            worker_response = llm_call(worker_input, "claude-haiku-4-5-20251001")
-            result = extract_xml(worker_response, "response")
+        return {
+            "analysis": analysis,
+            "tasks": worker_results,
+            "usage": self._total_usage(usage, worker_results),
+        }
 
-            worker_results.append(
+    async def aprocess(self, task: str, context: dict | None = None) -> Result:
+        """Like process, but run the workers concurrently.
+
+        The orchestrator's response is streamed, and each worker starts as
+        soon as its </task> arrives, while later tasks are still being
+        generated. At most max_concurrency workers run at once, and a worker
+        that takes longer than worker_timeout seconds is cancelled. A worker
+        that times out or whose request fails gets an error instead of a
+        result, and the other workers carry on. Each result is printed as
+        soon as its worker finishes; the returned tasks are in the
+        orchestrator's order.
+
+        Workers that start together would all miss the prompt cache, so
+        when there is a worker_system_prompt long enough to be cached, a
+        one-token request writes it to the cache while the orchestrator
+        runs, and the workers wait for it. With a response cache set, that
+        request is only sent once a worker's reply is not in the response
+        cache, and workers whose replies are cached do not wait for it.
+        """
+        context = context or {}
+        usage: Usage = {}
+
+        orchestrator_input = self._orchestrator_input(task, context)
+        worker_system = self._worker_system(task, context)
+
+        async def warm_cache() -> None:
+            try:
+                await allm_call(
+                    "Reply OK.", WORKER_MODEL, worker_system, usage, 1, use_cache=False
+                )
+            except APIError as e:
+                print(f"=== CACHE WARM-UP FAILED: {e} ===")
+                print()
+
+        warm_up = None
+        needs_warm_up = (
+            bool(worker_system)
+            and len(worker_system[0]["text"]) >= WORKER_CACHE_MIN_CHARS
+        )
+        if needs_warm_up and _response_cache is None:
+            warm_up = asyncio.create_task(warm_cache())
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_worker(task_info: TaskInfo) -> ExecutedTask:
+            nonlocal warm_up
+            worker_input = self._worker_input(task, task_info, context)
+            worker_usage: Usage = {}
+            if needs_warm_up and not _is_cached(
+                worker_input, WORKER_MODEL, worker_system
+            ):
+                if warm_up is None:
+                    warm_up = asyncio.create_task(warm_cache())
+                await warm_up
+            async with semaphore:
+                try:
+                    worker_response = await asyncio.wait_for(
+                        allm_call(
+                            worker_input, WORKER_MODEL, worker_system, worker_usage
+                        ),
+                        self.worker_timeout,
+                    )
+                except TimeoutError:
+                    print(f"=== WORKER TIMEOUT ({task_info['type']}) ===")
+                    print()
+                    error = f"Timed out after {self.worker_timeout} seconds"
+                    return self._worker_error(task_info, error)
+                except APIError as e:
+                    print(f"=== WORKER FAILED ({task_info['type']}): {e} ===")
+                    print()
+                    return self._worker_error(task_info, f"Request failed: {e}")
+            return self._worker_result(task_info, worker_response, worker_usage)
+
+        parser = TaskStreamParser()
+        workers = []
+        try:
+            async for text in allm_stream(
+                orchestrator_input, ORCHESTRATOR_MODEL, usage=usage
+            ):
+                for task_info in parser.feed(text):
+                    workers.append(asyncio.create_task(run_worker(task_info)))
+            self._print_orchestrator_output(parser.analysis, parser.tasks)
+            worker_results = list(await asyncio.gather(*workers))
+        except BaseException:
+            # gather does not cancel the other workers when one raises.
+            for worker in [warm_up, *workers]:
+                if worker is not None:
+                    worker.cancel()
+            raise
+        return {
+            "analysis": parser.analysis,
+            "tasks": worker_results,
+            "usage": self._total_usage(usage, worker_results),
+        }
+
+
+class BatchJob(TypedDict):
+    id: str
+    task: str
+    context: NotRequired[dict]
+    # Why the line is not a valid job.
+    error: NotRequired[str]
+
+
+def read_jobs(path: str | os.PathLike) -> Iterator[BatchJob]:
+    """Read jobs from JSONL: {"id": ..., "task": ..., "context": {...}} per
+    line. A job without an id gets its line number. A line that is not a
+    valid job, or whose id an earlier line already has, is yielded with an
+    "error", to be recorded as failed."""
+    first_lines: dict[str, int] = {}
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = _parse_job(line, line_number)
+            first_line = first_lines.setdefault(job["id"], line_number)
+            if first_line != line_number:
+                error = f"Duplicate id on line {line_number}, first on {first_line}"
+                job = {"id": job["id"], "task": "", "error": error}
+            yield job
+
+
+def _parse_job(line: str, line_number: int) -> BatchJob:
+    try:
+        job = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"id": str(line_number), "task": "", "error": f"Invalid JSON: {e}"}
+    if not isinstance(job, dict):
+        return {"id": str(line_number), "task": "", "error": "Not a JSON object"}
+    job["id"] = str(job.get("id", line_number))
+    if not isinstance(job.get("task"), str):
+        job["error"] = '"task" must be a string'
+    elif not isinstance(job.get("context") or {}, dict):
+        job["error"] = '"context" must be an object'
+    return job
+
+
+def _job_record(job_id: str, result: Result) -> dict:
+    """Return the output line for a job's result. If any of its tasks
+    failed, it gets an "error" too, so the job is retried on a rerun."""
+    record = {"id": job_id, **result}
+    failed = sum("error" in executed for executed in result["tasks"])
+    if failed:
+        record["error"] = f"{failed} of {len(result['tasks'])} tasks failed"
+    return record
+
+
+class Checkpoint:
+    """JSONL output written one result per line, each synced to disk.
+
+    `done` holds the ids already written without an error, so a rerun with
+    the same output skips them. A failed job is retried on a rerun and its
+    later line supersedes the error. `errors` holds the last error of the
+    other ids. A line cut short by a crash is removed, and a corrupt line is
+    reported and ignored, so its job is not done.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self.done: set[str] = set()
+        self.errors: dict[str, str] = {}
+        if self.path.exists():
+            data = self.path.read_bytes()
+            complete = data[: data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                with open(self.path, "r+b") as f:
+                    f.truncate(len(complete))
+            for line_number, line in enumerate(complete.splitlines(), 1):
+                try:
+                    record = json.loads(line)
+                    self._add(record)
+                except (json.JSONDecodeError, TypeError, KeyError) as e:
+                    print(
+                        f"{self.path}:{line_number}: ignoring a corrupt line ({e})",
+                        file=sys.stderr,
+                    )
+
+    def skips(self, job: BatchJob) -> bool:
+        """Whether a run can skip `job`: it is done, or it is invalid and
+        that error is already written."""
+        if job["id"] in self.done:
+            return True
+        return "error" in job and self.errors.get(job["id"]) == job["error"]
+
+    def write(self, record: dict) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._add(record)
+
+    def _add(self, record: dict) -> None:
+        if "error" in record:
+            if record["id"] not in self.done:
+                self.errors[record["id"]] = record["error"]
+        else:
+            self.done.add(record["id"])
+            self.errors.pop(record["id"], None)
+
+
+async def run_batch(
+    orchestrator: FlexibleOrchestrator,
+    input_path: str | os.PathLike,
+    output_path: str | os.PathLike,
+    max_jobs: int = 8,
+) -> None:
+    """Process every job in `input_path` with aprocess, `max_jobs` at a
+    time, appending each result to `output_path` as it finishes. Jobs
+    already in the output are skipped, so an interrupted run resumes. A job
+    that raises, or has a task that failed, is recorded with an error and
+    retried on the next run."""
+    checkpoint = Checkpoint(output_path)
+    queue: asyncio.Queue[BatchJob | None] = asyncio.Queue(maxsize=max_jobs * 2)
+    finished = 0
+
+    async def produce() -> None:
+        for job in read_jobs(input_path):
+            if not checkpoint.skips(job):
+                await queue.put(job)
+        for _ in range(max_jobs):
+            await queue.put(None)
+
+    async def consume() -> None:
+        nonlocal finished
+        while (job := await queue.get()) is not None:
+            if "error" in job:
+                record = {"id": job["id"], "error": job["error"]}
+            else:
+                try:
+                    result = await orchestrator.aprocess(
+                        job["task"], job.get("context")
+                    )
+                    record = _job_record(job["id"], result)
+                except Exception as e:
+                    record = {"id": job["id"], "error": f"{type(e).__name__}: {e}"}
+            checkpoint.write(record)
+            finished += 1
+            status = "failed" if "error" in record else "done"
+            print(f"[{finished}] {job['id']} {status}", file=sys.stderr)
+
+    await asyncio.gather(produce(), *(consume() for _ in range(max_jobs)))
+
+
+# The Message Batches API takes up to 100,000 requests or 256 MB per batch.
+# 10,000 requests of a few KB each stay well under the size limit, and
+# MAX_BATCH_BYTES cuts a batch short when the requests are longer.
+MAX_BATCH_REQUESTS = 10_000
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+
+
+def _custom_id(prefix: str, job_id: str, index: int | None = None) -> str:
+    # Custom IDs are limited to 64 characters of [a-zA-Z0-9_-].
+    digest = hashlib.sha256(job_id.encode()).hexdigest()[:32]
+    return f"{prefix}-{digest}" if index is None else f"{prefix}-{digest}-{index}"
+
+
+def _batch_request(
+    custom_id: str, prompt: str, model: str, system_prompt: str | list[dict] = ""
+) -> dict:
+    params = {
+        "model": model,
+        "max_tokens": 4096,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.1,
+    }
+    if system_prompt:
+        params["system"] = system_prompt
+    return {"custom_id": custom_id, "params": params}
+
+
+def _split_batches(requests: list[dict]) -> Iterator[list[dict]]:
+    batch, size = [], 0
+    for request in requests:
+        request_size = len(json.dumps(request).encode())
+        if batch and (
+            len(batch) == MAX_BATCH_REQUESTS or size + request_size > MAX_BATCH_BYTES
+        ):
+            yield batch
+            batch, size = [], 0
+        batch.append(request)
+        size += request_size
+    if batch:
+        yield batch
+
+
+def _submit_batches(requests: list[dict]) -> list[str]:
+    client = get_client()
+    return [
+        client.messages.batches.create(requests=batch).id
+        for batch in _split_batches(requests)
+    ]
+
+
+def _batch_results(batch_ids: list[str], poll_interval: float) -> dict:
+    """Wait for the batches to end and return their succeeded messages by
+    custom ID."""
+    client = get_client()
+    messages = {}
+    for batch_id in batch_ids:
+        while client.messages.batches.retrieve(batch_id).processing_status != "ended":
+            time.sleep(poll_interval)
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                messages[entry.custom_id] = entry.result.message
+    return messages
+
+
+def run_message_batches(
+    orchestrator: FlexibleOrchestrator,
+    input_path: str | os.PathLike,
+    output_path: str | os.PathLike,
+    poll_interval: float = 60.0,
+) -> None:
+    """Like run_batch, but send the orchestrator calls, then the worker calls,
+    through the Message Batches API, which costs half as much but may take
+    up to a day.
+
+    The submitted batch IDs are saved next to the output, so a rerun waits
+    for the same batches instead of submitting new ones.
+    """
+    checkpoint = Checkpoint(output_path)
+    state_path = Path(f"{output_path}.batches.json")
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    def save_state() -> None:
+        state_path.write_text(json.dumps(state))
+
+    jobs = []
+    for job in read_jobs(input_path):
+        if checkpoint.skips(job):
+            continue
+        if "error" in job:
+            checkpoint.write({"id": job["id"], "error": job["error"]})
+            continue
+        context = job.get("context") or {}
+        try:
+            job["orchestrator_input"] = orchestrator._format_prompt(
+                orchestrator.orchestrator_prompt, task=job["task"], **context
+            )
+        except Exception as e:
+            checkpoint.write({"id": job["id"], "error": f"{type(e).__name__}: {e}"})
+            continue
+        jobs.append(job)
+
+    if "orchestrator" not in state:
+        state["orchestrator"] = _submit_batches(
+            [
+                _batch_request(
+                    _custom_id("o", job["id"]),
+                    job["orchestrator_input"],
+                    ORCHESTRATOR_MODEL,
+                )
+                for job in jobs
+            ]
+        )
+        save_state()
+    orchestrator_messages = _batch_results(state["orchestrator"], poll_interval)
+
+    worker_requests = []
+    for job in jobs:
+        message = orchestrator_messages.get(_custom_id("o", job["id"]))
+        if message is None:
+            continue
+        parser = TaskStreamParser()
+        parser.feed(message.content[0].text)
+        job["analysis"], job["tasks"] = parser.analysis, parser.tasks
+        job["usage"] = {}
+        _record_usage(job["usage"], message)
+        try:
+            worker_requests.extend(_worker_batch_requests(orchestrator, job))
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+
+    if "workers" not in state:
+        state["workers"] = _submit_batches(worker_requests)
+        save_state()
+    worker_messages = _batch_results(state["workers"], poll_interval)
+
+    for job in jobs:
+        if "tasks" not in job:
+            checkpoint.write({"id": job["id"], "error": "Orchestrator request failed"})
+            continue
+        if "error" in job:
+            checkpoint.write({"id": job["id"], "error": job["error"]})
+            continue
+        worker_results = []
+        for index, task_info in enumerate(job["tasks"]):
+            executed: ExecutedTask = {**task_info, "result": ""}
+            message = worker_messages.get(_custom_id("w", job["id"], index))
+            if message is None:
+                executed["error"] = "Worker request failed"
+            else:
+                executed["result"] = extract_xml(message.content[0].text, "response")
+                executed["usage"] = {}
+                _record_usage(executed["usage"], message)
+            worker_results.append(executed)
+        checkpoint.write(
+            _job_record(
+                job["id"],
                 {
-                    "type": task_info["type"],
-                    "description": task_info["description"],
-                    "result": result,
-                }
+                    "analysis": job["analysis"],
+                    "tasks": worker_results,
+                    "usage": FlexibleOrchestrator._total_usage(
+                        job["usage"], worker_results
+                    ),
+                },
             )
+        )
+    state_path.unlink()
 
-            print(f"=== WORKER RESULT ({task_info['type']}) ===")
-            print(result)
-            print()
 
-        return {"analysis": analysis, "tasks": worker_results}
+def _worker_batch_requests(orchestrator: FlexibleOrchestrator, job: dict) -> list[dict]:
+    context = job.get("context") or {}
+    worker_system = ""
+    if orchestrator.worker_system_prompt is not None:
+        worker_system = cacheable(
+            orchestrator._format_prompt(
+                orchestrator.worker_system_prompt,
+                original_task=job["task"],
+                **context,
+            )
+        )
+    requests = []
+    for index, task_info in enumerate(job["tasks"]):
+        worker_input = orchestrator._format_prompt(
+            orchestrator.worker_prompt,
+            original_task=job["task"],
+            task_type=task_info["type"],
+            task_description=task_info["description"],
+            **context,
+        )
+        requests.append(
+            _batch_request(
+                _custom_id("w", job["id"], index),
+                worker_input,
+                WORKER_MODEL,
+                worker_system,
+            )
+        )
+    return requests
 
 
 ORCHESTRATOR_PROMPT = """
@@ -163,11 +1099,11 @@ Focus on how each approach serves different aspects of the task.
 </tasks>
 """
 
-WORKER_PROMPT = """
+# Too short to be cached (see WORKER_CACHE_MIN_CHARS), so the example run sends
+# no warm-up request. Prompt caching only applies to long custom prompts.
+WORKER_SYSTEM_PROMPT = """
 Generate content based on:
 Task: {original_task}
-Style: {task_type}
-Guidelines: {task_description}
 
 Return your response in this format:
 
@@ -176,11 +1112,60 @@ Your content here, maintaining the specified style and fully addressing requirem
 </response>
 """
 
-orchestrator = FlexibleOrchestrator(ORCHESTRATOR_PROMPT, WORKER_PROMPT)
-results = orchestrator.process(
-    task="Write a product description for a new eco-friendly water bottle",
-    context={
-        "target_audience": "environmentally conscious millennials",
-        "key_features": ["plastic-free", "insulated", "lifetime warranty"],
-    },
-)
+WORKER_PROMPT = """
+Style: {task_type}
+Guidelines: {task_description}
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Orchestrator-workers pattern")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser(
+        "batch", help="process the jobs in a JSONL file, resuming a previous run"
+    )
+    batch.add_argument("input", help="JSONL of {id, task, context}")
+    batch.add_argument("output", help="JSONL results, appended to")
+    batch.add_argument("--jobs", type=int, default=8, help="jobs in flight")
+    batch.add_argument(
+        "--message-batches",
+        action="store_true",
+        help="send the requests through the Message Batches API",
+    )
+    batch.add_argument("--poll-interval", type=float, default=60.0)
+    batch.add_argument(
+        "--verbose", action="store_true", help="print prompts and results"
+    )
+    args = parser.parse_args()
+
+    if os.environ.get("LLM_CACHE_PATH"):
+        set_response_cache(ResponseCache(os.environ["LLM_CACHE_PATH"]))
+    orchestrator = FlexibleOrchestrator(
+        ORCHESTRATOR_PROMPT, WORKER_PROMPT, worker_system_prompt=WORKER_SYSTEM_PROMPT
+    )
+    if args.command == "batch":
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(
+                    contextlib.redirect_stdout(
+                        stack.enter_context(open(os.devnull, "w"))
+                    )
+                )
+            if args.message_batches:
+                run_message_batches(
+                    orchestrator, args.input, args.output, args.poll_interval
+                )
+            else:
+                asyncio.run(run_batch(orchestrator, args.input, args.output, args.jobs))
+    else:
+        results = asyncio.run(
+            orchestrator.aprocess(
+                task="Write a product description for a new eco-friendly water bottle",
+                context={
+                    "target_audience": "environmentally conscious millennials",
+                    "key_features": ["plastic-free", "insulated", "lifetime warranty"],
+                },
+            )
+        )
+    if _response_cache is not None:
+        print("=== RESPONSE CACHE ===", file=sys.stderr)
+        print(_response_cache.stats(), file=sys.stderr)